@@ -0,0 +1,185 @@
+"""
+Persistent cache of per-file scan results
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .types import Issue, IssueType, Severity, VersionChange
+
+logger = logging.getLogger(__name__)
+
+# Entries older than this are ignored and pruned
+CACHE_TTL_SECONDS = 24 * 60 * 60
+# Oldest entries beyond this count are pruned when the cache is opened
+CACHE_MAX_ENTRIES = 2000
+
+
+def default_cache_path() -> Path:
+    """Location of the results database, honouring XDG_CACHE_HOME"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "bvd" / "results.db"
+
+
+def _encode_issues(issues: List[Issue]) -> bytes:
+    """Plain JSON records for issues, loading them back never runs code"""
+    records = [
+        {
+            "severity": issue.severity.value,
+            "type": issue.issue_type.value,
+            "message": issue.message,
+            "suggestion": issue.suggestion,
+            "change": asdict(issue.change),
+        }
+        for issue in issues
+    ]
+    return json.dumps(records).encode()
+
+
+def _decode_issues(data: bytes) -> List[Issue]:
+    """Issues from records written by _encode_issues"""
+    return [
+        Issue(
+            severity=Severity(record["severity"]),
+            issue_type=IssueType(record["type"]),
+            message=record["message"],
+            change=VersionChange(**record["change"]),
+            suggestion=record["suggestion"],
+        )
+        for record in json.loads(data)
+    ]
+
+
+def config_digest(config: Dict[str, Any]) -> bytes:
+    """Stable digest of a detector config, enum keys and values included"""
+
+    def canonical(value: Any) -> Any:
+        if isinstance(value, Enum):
+            return value.value
+        if isinstance(value, dict):
+            return sorted((str(canonical(k)), canonical(v)) for k, v in value.items())
+        if isinstance(value, (set, frozenset)):
+            return sorted(canonical(v) for v in value)
+        if isinstance(value, (list, tuple)):
+            return [canonical(v) for v in value]
+        return value
+
+    encoded = json.dumps(canonical(config), default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=16).digest()
+
+
+class ResultCache:
+    """SQLite backed cache of issues found per file, keyed by everything that affects them"""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path) if path else default_cache_path()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        # Lookups served and missed since opening, for --verbose diagnostics
+        self.hits = 0
+        self.misses = 0
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Files are processed on a thread pool, access is serialized by _lock
+            self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results (key BLOB PRIMARY KEY, issues BLOB, ts INTEGER)"
+            )
+            self._prune()
+            self._conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            self._disable(e)
+
+    @staticmethod
+    def key(*parts: Union[str, bytes]) -> bytes:
+        """Digest of the given key parts"""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            data = part.encode() if isinstance(part, str) else part
+            # Length prefix so that part boundaries cannot collide
+            digest.update(len(data).to_bytes(8, "little"))
+            digest.update(data)
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[List[Issue]]:
+        """Cached issues for key, or None on a miss"""
+        with self._lock:
+            if self._conn is None:
+                return None
+            try:
+                row = self._conn.execute(
+                    "SELECT issues FROM results WHERE key = ? AND ts >= ?",
+                    (key, int(time.time()) - CACHE_TTL_SECONDS),
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                issues = _decode_issues(row[0])
+                self.hits += 1
+                return issues
+            except Exception as e:
+                # Rows from another format or a damaged file must never fail the scan
+                self._disable(e)
+                return None
+
+    def put(self, key: bytes, issues: List[Issue]):
+        """Store issues for key, written out on flush()"""
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (key, issues, ts) VALUES (?, ?, ?)",
+                    (key, _encode_issues(issues), int(time.time())),
+                )
+            except sqlite3.Error as e:
+                self._disable(e)
+
+    def flush(self):
+        """Commit pending entries"""
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._disable(e)
+
+    def close(self):
+        """Commit pending entries and close the database"""
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _prune(self):
+        """Drop expired entries and the oldest ones beyond CACHE_MAX_ENTRIES"""
+        assert self._conn is not None
+        self._conn.execute(
+            "DELETE FROM results WHERE ts < ?", (int(time.time()) - CACHE_TTL_SECONDS,)
+        )
+        self._conn.execute(
+            "DELETE FROM results WHERE key NOT IN "
+            "(SELECT key FROM results ORDER BY ts DESC LIMIT ?)",
+            (CACHE_MAX_ENTRIES,),
+        )
+
+    def _disable(self, error: Exception):
+        """Carry on without a cache, a broken cache must never fail a scan"""
+        logger.warning("Result cache disabled (%s): %s", self.path, error)
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:  # pragma: no cover
+                pass
+        self._conn = None
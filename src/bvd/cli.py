@@ -2,6 +2,7 @@
 Command line interface for BVD
 """
 
+import logging
 import sys
 from pathlib import Path
 
@@ -10,19 +11,42 @@ import click
 from .core import Severity, VersionDetector
 
 
+def _configure_logging(verbose: bool = False):
+    """Send bvd's diagnostics to stderr, with cache statistics when verbose"""
+    logging.basicConfig(level=logging.WARNING, format="%(message)s", stream=sys.stderr)
+    logging.getLogger("bvd").setLevel(logging.DEBUG if verbose else logging.NOTSET)
+
+
 @click.command()
 @click.option("--files", multiple=True, help="Specific files to check")
 @click.option("--format", type=click.Choice(["text", "json"]), default="text", help="Output format")
 @click.option("--base-ref", default="HEAD~1", help="Git ref to compare against")
+@click.option(
+    "--changed-only", is_flag=True, help="Skip given files that are unchanged since base-ref"
+)
+@click.option(
+    "--cache/--no-cache",
+    default=False,
+    envvar="BVD_CACHE",
+    help="Reuse results for unchanged files across runs (also BVD_CACHE=1)",
+)
 @click.option("--verbose", "-v", is_flag=True, help="Verbose output")
 @click.pass_context
-def main(ctx, files, format, base_ref, verbose):
+def main(ctx, files, format, base_ref, changed_only, cache, verbose):
     """Breaking Version Detector - Find dangerous dependency changes"""
+    _configure_logging(verbose)
 
     if verbose:
         click.echo("🔍 Breaking Version Detector starting...")
 
-    detector = VersionDetector()
+    config = {}
+    if changed_only:
+        config["changed_only"] = True
+    if cache:
+        config["cache"] = True
+    detector = VersionDetector(config or None)
+    # Runs on every exit path, including the sys.exit calls below
+    ctx.call_on_close(detector.close)
 
     file_paths = None
     if files:
@@ -74,9 +98,12 @@ def main(ctx, files, format, base_ref, verbose):
 @click.command()
 @click.argument("file_path", type=click.Path(exists=True))
 @click.option("--base-ref", default="HEAD~1", help="Git ref to compare against")
-def check_file(file_path, base_ref):
+@click.pass_context
+def check_file(ctx, file_path, base_ref):
     """Check a specific file for unbound version constraints"""
+    _configure_logging()
     detector = VersionDetector()
+    ctx.call_on_close(detector.close)
     issues = detector.detect_issues([Path(file_path)], base_ref)
 
     if issues:
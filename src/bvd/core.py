@@ -2,16 +2,296 @@
 Core classes for the Breaking Version Detector
 """
 
+import fnmatch
+import hashlib
 import json
+import logging
+import os
+import re
 import subprocess
-import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import replace
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+from .cache import ResultCache, config_digest
 from .parsers.base import DependencyParser
 from .parsers.terraform import TerraformParser
 from .semver import compare_versions
-from .types import Issue, IssueType, Severity, VersionChange
+from .types import SEVERITY_EMOJI, Issue, IssueType, Severity, VersionChange
+
+logger = logging.getLogger(__name__)
+
+PARSE_CACHE_SIZE = 2000
+
+# Characters that make a file pattern a real glob rather than a literal name or suffix
+_GLOB_CHARS = frozenset("*?[")
+
+# Below this many files the thread pool costs more than it saves
+PARALLEL_MIN_FILES = 4
+# Upper bound on file processing threads
+MAX_WORKERS = 8
+
+
+def _upgrade_templates(issue_type: IssueType) -> Tuple[str, str]:
+    """Message and suggestion templates shared by all upgrade issue types"""
+    title = issue_type.value.replace("_", " ").title()
+    return (
+        f"{title} detected: {{pkg}} changed from {{old}} to {{new}}",
+        "Review breaking changes in {pkg} changelog between versions {old} and {new}",
+    )
+
+
+# (message, suggestion) templates per version change, filled with pkg, old and new
+_VERSION_CHANGE_TEMPLATES: Dict[IssueType, Tuple[str, str]] = {
+    IssueType.MAJOR_VERSION_BUMP: _upgrade_templates(IssueType.MAJOR_VERSION_BUMP),
+    IssueType.MINOR_VERSION_BUMP: _upgrade_templates(IssueType.MINOR_VERSION_BUMP),
+    IssueType.PATCH_VERSION_BUMP: _upgrade_templates(IssueType.PATCH_VERSION_BUMP),
+    IssueType.MAJOR_VERSION_DOWNGRADE: (
+        "Major version downgrade detected: {pkg} downgraded from {old} to {new} - "
+        "potential feature loss and security vulnerabilities",
+        "Review {pkg} changelog for removed features and fixes. "
+        "Verify your code doesn't depend on features from {old}. "
+        "Consider security implications of missing patches.",
+    ),
+    IssueType.MINOR_VERSION_DOWNGRADE: (
+        "Minor version downgrade detected: {pkg} downgraded from {old} to {new} - "
+        "potential feature loss and missing bug fixes",
+        "Review {pkg} changelog for removed features and bug fixes. "
+        "Verify your code doesn't depend on features from {old}.",
+    ),
+    IssueType.PATCH_VERSION_DOWNGRADE: (
+        "Patch version downgrade detected: {pkg} downgraded from {old} to {new} - "
+        "missing bug fixes and security patches",
+        "Review {pkg} changelog for bug fixes and security patches "
+        "that may be missing in version {new}.",
+    ),
+}
+
+
+def _git_env() -> Dict[str, str]:
+    """Environment for git calls, bvd only reads so git must not refresh and lock the index"""
+    return {**os.environ, "GIT_OPTIONAL_LOCKS": "0"}
+
+
+def _object_name(ref: str, file_path: Path) -> str:
+    """git object name for file_path at ref
+
+    git resolves "<ref>:<path>" from the top of the work tree, a "./" prefix makes
+    it resolve from the cwd like the paths bvd is given.
+    """
+    if file_path.is_absolute():
+        file_path = Path(os.path.relpath(file_path))
+    return f"{ref}:./{file_path.as_posix()}"
+
+
+def _decode_text(data: bytes, errors: str = "strict") -> str:
+    """Decode UTF-8 file bytes with universal newlines, like Path.read_text()"""
+    text = data.decode("utf-8", errors=errors)
+    if "\r" in text:
+        # HCL parsing fails on carriage returns, normalize like text mode reads do
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _read_file(file_path: Path) -> str:
+    """Read a file straight from its descriptor, sized by a single fstat"""
+    fd = os.open(file_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        size = os.fstat(fd).st_size + 1
+        chunks = []
+        # The first read normally returns the whole file, loop in case it grew meanwhile
+        while chunk := os.read(fd, size):
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    return _decode_text(b"".join(chunks))
+
+
+# (upgrade, downgrade) issue types per version component, most significant first
+_CHANGE_TYPES = (
+    (IssueType.MAJOR_VERSION_BUMP, IssueType.MAJOR_VERSION_DOWNGRADE),
+    (IssueType.MINOR_VERSION_BUMP, IssueType.MINOR_VERSION_DOWNGRADE),
+    (IssueType.PATCH_VERSION_BUMP, IssueType.PATCH_VERSION_DOWNGRADE),
+)
+
+
+@lru_cache(maxsize=4096)
+def _classify_version_change(old_ver: str, new_ver: str) -> Optional[IssueType]:
+    """Issue type for the most significant changed component, pairs repeat across files"""
+    version_diff = compare_versions(old_ver, new_ver)
+    if version_diff is None:
+        # Handle non-semver versions
+        return None
+
+    for (bump, downgrade), diff in zip(_CHANGE_TYPES, version_diff):
+        if diff:
+            return bump if diff > 0 else downgrade
+
+    return None
+
+
+class _ThreadErrors(logging.Handler):
+    """Collects error records bvd logs from the thread that created the handler"""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self._thread = threading.get_ident()
+        self.records: List[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord):
+        if record.thread == self._thread:
+            self.records.append(record)
+
+
+@contextmanager
+def _logged_errors() -> Iterator[List[logging.LogRecord]]:
+    """Error records logged anywhere in bvd by the current thread inside the block"""
+    handler = _ThreadErrors()
+    package_logger = logging.getLogger(__package__)
+    package_logger.addHandler(handler)
+    try:
+        yield handler.records
+    finally:
+        package_logger.removeHandler(handler)
+
+
+class _CatFileBatch:
+    """Long-running git cat-file --batch process serving a detector's blob lookups
+
+    The process is started on first use and shared by all threads of a detector,
+    requests and replies are serialized by a lock. Object names resolve against
+    the process cwd, so it is restarted when the caller's cwd changes.
+    """
+
+    def __init__(self):
+        self._process: Optional[subprocess.Popen] = None
+        self._cwd: Optional[str] = None
+        self._failed = False
+        self._lock = threading.Lock()
+
+    def lookup(self, object_name: str) -> Tuple[bool, Optional[bytes]]:
+        """Look up an object such as "HEAD~1:main.tf"
+
+        Returns (answered, content). answered is False when the process is not
+        usable, in which case the caller should fall back to another git call.
+        content is None for missing objects and anything that is not a blob.
+        """
+        contents = self.lookup_many([object_name])
+        if contents is None:
+            return False, None
+        return True, contents[0]
+
+    def lookup_many(self, object_names: List[str]) -> Optional[List[Optional[bytes]]]:
+        """Look up several objects in one pipelined round trip
+
+        All requests are sent before the replies are read, replies come back in
+        request order. Returns None when the process is not usable.
+        """
+        if any("\n" in name for name in object_names):
+            return None
+
+        with self._lock:
+            try:
+                cwd = os.getcwd()
+            except OSError:
+                return None
+            if cwd != self._cwd:
+                # Possibly another repository, or a repository where there was none
+                self._close()
+                self._cwd = cwd
+                self._failed = False
+            if self._failed:
+                return None
+
+            try:
+                if self._process is None:
+                    self._process = subprocess.Popen(
+                        ["git", "cat-file", "--batch"],
+                        stdin=subprocess.PIPE,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.DEVNULL,
+                        cwd=cwd,
+                        env=_git_env(),
+                    )
+
+                stdin, stdout = self._process.stdin, self._process.stdout
+                assert stdin is not None and stdout is not None
+                request = "".join(f"{name}\n" for name in object_names).encode()
+                writer = None
+                if len(object_names) == 1:
+                    self._write(stdin, request)
+                else:
+                    # git stops reading requests while its reply pipe is full, so a large
+                    # batch has to be written while the replies are being drained
+                    writer = threading.Thread(target=self._write, args=(stdin, request))
+                    writer.start()
+                try:
+                    contents = [self._read_reply(stdout) for _ in object_names]
+                finally:
+                    if writer is not None:
+                        writer.join()
+            except (OSError, ValueError):
+                # Not a repository, git missing or an unexpected reply, stop using the process
+                self._failed = True
+                self._close()
+                return None
+
+        return contents
+
+    @staticmethod
+    def _write(stdin, request: bytes):
+        try:
+            stdin.write(request)
+            stdin.flush()
+        except OSError:
+            # git exited, the reader notices the closed pipe and gives up
+            pass
+
+    @staticmethod
+    def _read_reply(stdout) -> Optional[bytes]:
+        """Read one reply, a "<name> missing" line or a "<sha> <type> <size>" header and content"""
+        header = stdout.readline()
+        if not header:
+            raise BrokenPipeError("git cat-file exited")
+        if header.endswith((b" missing\n", b" ambiguous\n")):
+            return None
+
+        _sha, kind, size = header.split()
+        content = stdout.read(int(size))
+        if len(content) != int(size) or stdout.read(1) != b"\n":
+            raise BrokenPipeError("git cat-file reply truncated")
+        return content if kind == b"blob" else None
+
+    def close(self):
+        """Shut down the process if one was started"""
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._process is None:
+            return
+
+        process, self._process = self._process, None
+        try:
+            if process.stdin:
+                process.stdin.close()
+            process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+        finally:
+            if process.stdout:
+                process.stdout.close()
 
 
 class VersionDetector:
@@ -30,6 +310,18 @@ class VersionDetector:
         else:
             self.config = default_config
         self.parsers: Dict[str, DependencyParser] = {}
+        self._exact_names: Dict[str, Tuple[int, DependencyParser]] = {}
+        self._suffixes: Dict[str, Tuple[int, DependencyParser]] = {}
+        self._suffix_lengths: List[int] = []
+        self._pattern_table: List[Tuple[int, Optional[re.Pattern], str, DependencyParser]] = []
+        self._parser_cache: Dict[str, Optional[DependencyParser]] = {}
+        self._old_blobs: Dict[Tuple[str, Path], Optional[str]] = {}
+        self._parse_cache: Dict[Tuple[str, str, bytes], List[VersionChange]] = {}
+        self._parse_lock = threading.Lock()
+        self._severity_cache: Dict[Tuple[str, IssueType], Severity] = {}
+        self._result_cache: Optional[ResultCache] = None
+        self._config_key = b""
+        self._cat_file = _CatFileBatch()
         self._register_default_parsers()
 
     def _default_config(self) -> Dict[str, Any]:
@@ -45,6 +337,11 @@ class VersionDetector:
                 IssueType.LOOSE_CONSTRAINT: Severity.WARNING,
             },
             "ignore_packages": [],
+            # Persist per-file results across runs, see bvd.cache
+            "cache": False,
+            "cache_path": None,
+            # Only scan explicitly passed files that differ from the base ref
+            "changed_only": False,
             "critical_packages": {
                 "hashicorp/aws": Severity.CRITICAL,
                 "hashicorp/kubernetes": Severity.CRITICAL,
@@ -58,113 +355,268 @@ class VersionDetector:
     def register_parser(self, parser: DependencyParser):
         """Register a new dependency parser"""
         self.parsers[parser.name] = parser
+        self._build_pattern_table()
+
+    def _build_pattern_table(self):
+        """Index every parser's file patterns, ranked in registration order
+
+        Plain names and "*<suffix>" globs become dict lookups, anything else is
+        kept as a compiled pattern. Ranks make the first registered match win.
+        """
+        exact: Dict[str, Tuple[int, DependencyParser]] = {}
+        suffixes: Dict[str, Tuple[int, DependencyParser]] = {}
+        table: List[Tuple[int, Optional[re.Pattern], str, DependencyParser]] = []
+        rank = 0
+        for parser in self.parsers.values():
+            for pattern in parser.supported_files:
+                literal = pattern[1:] if pattern.startswith("*") else pattern
+                if "/" in pattern:
+                    # Patterns spanning directories keep PurePath.match semantics
+                    table.append((rank, None, pattern, parser))
+                elif not literal or _GLOB_CHARS.intersection(literal):
+                    table.append((rank, re.compile(fnmatch.translate(pattern)), pattern, parser))
+                elif not pattern.startswith("*"):
+                    exact.setdefault(pattern, (rank, parser))
+                else:
+                    suffixes.setdefault(literal, (rank, parser))
+                rank += 1
+
+        self._exact_names = exact
+        self._suffixes = suffixes
+        self._suffix_lengths = sorted({len(suffix) for suffix in suffixes})
+        self._pattern_table = table
+        self._parser_cache = {}
 
     def get_changed_files(self, base_ref: str = "HEAD~1") -> List[Path]:
         """Get list of changed files from git diff"""
         try:
+            # git diff names are relative to the top of the work tree, not the cwd
+            toplevel = subprocess.run(
+                ["git", "rev-parse", "--show-toplevel"],
+                capture_output=True,
+                check=True,
+                env=_git_env(),
+            )
+            root = os.fsdecode(toplevel.stdout.rstrip(b"\r\n"))
+
+            # -z gives NUL separated, unquoted paths so odd file names survive intact,
+            # deleted files are dropped by git rather than stat'ed here
             result = subprocess.run(
-                ["git", "diff", "--name-only", base_ref], capture_output=True, text=True, check=True
+                ["git", "diff", "-z", "--name-only", "--diff-filter=d", base_ref],
+                capture_output=True,
+                check=True,
+                env=_git_env(),
             )
 
             changed_files = []
-            for line in result.stdout.strip().split("\n"):
-                if line:
-                    path = Path(line)
+            for name in result.stdout.split(b"\0"):
+                if name:
+                    path = Path(root, os.fsdecode(name))
                     if path.exists():
-                        changed_files.append(path)
+                        # Relative to the cwd, like paths given on the command line
+                        changed_files.append(Path(os.path.relpath(path)))
 
             return changed_files
 
         except (subprocess.CalledProcessError, FileNotFoundError) as e:
-            print(f"Error getting changed files: {e}", file=sys.stderr)
+            logger.error("Error getting changed files: %s", e)
             return []
 
+    def _changed_set(self, base_ref: str) -> Set[Path]:
+        """Get resolved paths of files that differ from base_ref"""
+        return {path.resolve() for path in self.get_changed_files(base_ref)}
+
     def get_file_content_at_ref(self, file_path: Path, ref: str) -> Optional[str]:
         """Get file content at a specific git ref"""
+        # Serve from the batch fetched by detect_issues when available
+        key = (ref, file_path)
+        if key in self._old_blobs:
+            return self._old_blobs[key]
+
+        object_name = _object_name(ref, file_path)
+        answered, content = self._cat_file.lookup(object_name)
+        if answered:
+            return None if content is None else _decode_text(content, errors="replace")
+
         try:
             result = subprocess.run(
-                ["git", "show", f"{ref}:{file_path}"], capture_output=True, text=True, check=True
+                ["git", "show", object_name],
+                capture_output=True,
+                text=True,
+                check=True,
+                env=_git_env(),
             )
             return result.stdout
         except (subprocess.CalledProcessError, FileNotFoundError):
             return None
 
+    def close(self):
+        """Release the git helper process and result cache held by this detector"""
+        self._cat_file.close()
+        if self._result_cache is not None:
+            self._result_cache.close()
+            self._result_cache = None
+
+    def __enter__(self) -> "VersionDetector":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        # Best effort cleanup, __init__ may not have finished
+        cat_file = getattr(self, "_cat_file", None)
+        if cat_file is not None:
+            cat_file.close()
+
+    def _fetch_old_blobs(self, file_paths: List[Path], base_ref: str) -> Dict[Path, Optional[str]]:
+        """Fetch the content of every file at base_ref in one pipelined cat-file round trip"""
+        file_paths = [path for path in file_paths if "\n" not in str(path)]
+        if not file_paths:
+            return {}
+
+        contents = self._cat_file.lookup_many([_object_name(base_ref, path) for path in file_paths])
+        if contents is None:
+            # git is not usable here, per-file lookups fall back to git show
+            return {}
+
+        return {
+            path: None if content is None else _decode_text(content, errors="replace")
+            for path, content in zip(file_paths, contents)
+        }
+
     def get_dependency_changes(
-        self, file_path: Path, base_ref: str = "HEAD~1"
+        self,
+        file_path: Path,
+        base_ref: str = "HEAD~1",
+        parser: Optional[DependencyParser] = None,
+        contents: Optional[Tuple[str, Optional[str]]] = None,
     ) -> List[VersionChange]:
-        """Get dependency changes between base_ref and current state"""
-        parser = self.find_matching_parser(file_path)
+        """Get dependency changes between base_ref and current state
+
+        contents is the (current, old) text of the file when the caller already
+        loaded it, old is None for a file that does not exist at base_ref.
+        """
+        parser = parser or self.find_matching_parser(file_path)
         if not parser:
             return []
 
         changes = []
 
         try:
-            # Get current content
-            current_content = file_path.read_text()
-            current_deps = parser.parse_dependencies(file_path, current_content)
+            if contents is None:
+                contents = self._load_contents(file_path, base_ref)
+            current_content, old_content = contents
+            current_deps = self._parse_dependencies(parser, file_path, current_content)
 
-            # Get old content from git
-            old_content = self.get_file_content_at_ref(file_path, base_ref)
             if old_content is None:
                 # File is new, treat all current deps as additions
                 return current_deps
 
-            old_deps = parser.parse_dependencies(file_path, old_content)
-
-            # Create lookup maps
-            old_dep_map = {dep.package_name: dep for dep in old_deps}
+            if old_content == current_content or self._same_dependency_lines(
+                parser, old_content, current_content
+            ):
+                # Untouched file, or only lines that cannot declare dependencies changed,
+                # the old parse would come out identical to the current one
+                old_deps = current_deps
+            else:
+                old_deps = self._parse_dependencies(parser, file_path, old_content)
+
+            # The old side only contributes its version and constraint per package
+            old_versions = {
+                dep.package_name: (dep.new_version, dep.new_constraint) for dep in old_deps
+            }
             current_dep_map = {dep.package_name: dep for dep in current_deps}
 
             # Find changes and additions
             for pkg_name, current_dep in current_dep_map.items():
-                if pkg_name in old_dep_map:
-                    old_dep = old_dep_map[pkg_name]
-                    # Update with old version info
-                    current_dep.old_version = old_dep.new_version
-                    current_dep.old_constraint = old_dep.new_constraint
+                old = old_versions.get(pkg_name)
+                if old is not None:
+                    # Fill in old version info
+                    current_dep = replace(current_dep, old_version=old[0], old_constraint=old[1])
 
                 changes.append(current_dep)
 
         except Exception as e:
-            print(f"Error getting dependency changes for {file_path}: {e}", file=sys.stderr)
+            logger.error("Error getting dependency changes for %s: %s", file_path, e)
 
         return changes
 
+    def _load_contents(self, file_path: Path, base_ref: str) -> Tuple[str, Optional[str]]:
+        """Current text of a file and its text at base_ref, None if it is new"""
+        return _read_file(file_path), self.get_file_content_at_ref(file_path, base_ref)
+
+    @staticmethod
+    def _same_dependency_lines(parser: DependencyParser, old: str, new: str) -> bool:
+        """Check whether two file versions differ only in lines that declare nothing"""
+        line_re = parser.dependency_line_re
+        if line_re is None:
+            return False
+        old_lines = [line for line in old.splitlines() if line_re.search(line)]
+        new_lines = [line for line in new.splitlines() if line_re.search(line)]
+        return old_lines == new_lines
+
+    def _parse_dependencies(
+        self, parser: DependencyParser, file_path: Path, content: str
+    ) -> List[VersionChange]:
+        """Parse dependencies, reusing earlier results for identical content
+
+        Entries are stored without a file path, each lookup fills in its own.
+        """
+        digest = hashlib.blake2b(content.encode(), digest_size=16).digest()
+        key = (parser.name, parser.version, digest)
+        with self._parse_lock:
+            entry = self._parse_cache.get(key)
+        if entry is not None:
+            path = str(file_path)
+            return [replace(dep, file_path=path) for dep in entry]
+
+        with _logged_errors() as errors:
+            deps = parser.parse_dependencies(file_path, content)
+        if errors:
+            # Not cached, every file with this content has to report the failure
+            return deps
+
+        entry = [replace(dep, file_path="") for dep in deps]
+        with self._parse_lock:
+            if len(self._parse_cache) >= PARSE_CACHE_SIZE:
+                # Evict the oldest entry, dicts keep insertion order
+                del self._parse_cache[next(iter(self._parse_cache))]
+            self._parse_cache[key] = entry
+        return deps
+
     def find_matching_parser(self, file_path: Path) -> Optional[DependencyParser]:
         """Find parser that can handle the given file"""
-        for parser in self.parsers.values():
-            for pattern in parser.supported_files:
-                if file_path.match(pattern) or file_path.name == pattern:
-                    return parser
-        return None
+        key = str(file_path)
+        if key in self._parser_cache:
+            return self._parser_cache[key]
+
+        name = file_path.name
+        best = self._exact_names.get(name)
+        for length in self._suffix_lengths:
+            hit = self._suffixes.get(name[-length:])
+            if hit is not None and (best is None or hit[0] < best[0]):
+                best = hit
+
+        # Remaining globs only matter if they were registered before the best hit
+        for rank, regex, pattern, parser in self._pattern_table:
+            if best is not None and rank > best[0]:
+                break
+            if regex is not None:
+                matched = regex.match(name) is not None
+            else:
+                matched = file_path.match(pattern)
+            if matched:
+                best = (rank, parser)
+                break
+
+        match = best[1] if best is not None else None
+        self._parser_cache[key] = match
+        return match
 
     def analyze_version_change(self, old_ver: str, new_ver: str) -> Optional[IssueType]:
         """Analyze version change and return issue type if any"""
-        version_diff = compare_versions(old_ver, new_ver)
-        if version_diff is None:
-            # Handle non-semver versions
-            return None
-
-        major_diff, minor_diff, patch_diff = version_diff
-
-        # Check for major changes first (upgrades and downgrades)
-        if major_diff > 0:
-            return IssueType.MAJOR_VERSION_BUMP
-        elif major_diff < 0:
-            return IssueType.MAJOR_VERSION_DOWNGRADE
-        # Then minor changes
-        elif minor_diff > 0:
-            return IssueType.MINOR_VERSION_BUMP
-        elif minor_diff < 0:
-            return IssueType.MINOR_VERSION_DOWNGRADE
-        # Finally patch changes
-        elif patch_diff > 0:
-            return IssueType.PATCH_VERSION_BUMP
-        elif patch_diff < 0:
-            return IssueType.PATCH_VERSION_DOWNGRADE
-
-        return None
+        return _classify_version_change(old_ver, new_ver)
 
     def detect_issues(
         self, file_paths: Optional[List[Path]] = None, base_ref: str = "HEAD~1"
@@ -172,25 +624,121 @@ class VersionDetector:
         """Main detection method"""
         if file_paths is None:
             file_paths = self.get_changed_files(base_ref)
+        elif self.config.get("changed_only"):
+            # Unchanged files cannot introduce version changes, skip them entirely
+            changed = self._changed_set(base_ref)
+            file_paths = [path for path in file_paths if path.resolve() in changed]
+
+        # Fetch all old file contents up front instead of one git call per file
+        parsed_paths = [path for path in file_paths if self.find_matching_parser(path)]
+        old_blobs = self._fetch_old_blobs(parsed_paths, base_ref)
+        self._old_blobs = {(base_ref, path): content for path, content in old_blobs.items()}
+
+        # Loop invariant for the whole scan, resolved once rather than per change
+        ignored = self._ignored_packages()
+        # Config may have been edited since the last scan
+        self._severity_cache = {}
+        if self.config.get("cache"):
+            # Imported late, the package __init__ imports this module
+            from . import __version__
+
+            if self._result_cache is None:
+                self._result_cache = ResultCache(self.config.get("cache_path"))
+            # Results depend on bvd itself as much as on the config
+            self._config_key = ResultCache.key(__version__, config_digest(self.config))
 
         issues = []
-        for file_path in file_paths:
-            issues.extend(self._process_file_for_issues(file_path, base_ref))
+        try:
+            if len(file_paths) < PARALLEL_MIN_FILES:
+                for file_path in file_paths:
+                    issues.extend(self._process_file_for_issues(file_path, base_ref, ignored))
+            else:
+                # Old contents are prefetched, what is left per file is a disk read and a
+                # GIL bound parse, so a few threads capture the overlap
+                max_workers = min(MAX_WORKERS, len(file_paths))
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    results = executor.map(
+                        self._process_file_for_issues,
+                        file_paths,
+                        repeat(base_ref),
+                        repeat(ignored),
+                    )
+                    for file_issues in results:
+                        issues.extend(file_issues)
+        finally:
+            self._old_blobs = {}
+            if self._result_cache is not None:
+                self._result_cache.flush()
+
+        if logger.isEnabledFor(logging.DEBUG):
+            self._log_cache_stats(len(file_paths))
 
         return issues
 
-    def _process_file_for_issues(self, file_path: Path, base_ref: str) -> List[Issue]:
+    def _log_cache_stats(self, file_count: int):
+        """Report how often the caches saved work during the last scan"""
+        logger.debug(
+            "Scanned %d files: %d cached parses, version classification %s",
+            file_count,
+            len(self._parse_cache),
+            _classify_version_change.cache_info(),
+        )
+        if self._result_cache is not None:
+            logger.debug(
+                "Result cache: %d hits, %d misses",
+                self._result_cache.hits,
+                self._result_cache.misses,
+            )
+
+    def _process_file_for_issues(
+        self, file_path: Path, base_ref: str, ignored: Optional[FrozenSet[str]] = None
+    ) -> List[Issue]:
         """Process a single file and return any issues found"""
         parser = self.find_matching_parser(file_path)
         if not parser:
             return []
 
+        if ignored is None:
+            ignored = self._ignored_packages()
+
+        if self._result_cache is None:
+            return self._file_issues(file_path, base_ref, parser, ignored)
+
+        try:
+            contents = self._load_contents(file_path, base_ref)
+        except (OSError, UnicodeDecodeError):
+            # Let the regular path report the problem
+            return self._file_issues(file_path, base_ref, parser, ignored)
+
+        cache_key = self._result_key(parser, file_path, *contents)
+        cached = self._result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        with _logged_errors() as errors:
+            issues = self._file_issues(file_path, base_ref, parser, ignored, contents)
+        # A cached result would hide the error on later runs, so only clean ones are kept
+        if not errors and self._result_cache is not None:
+            self._result_cache.put(cache_key, issues)
+        return issues
+
+    def _file_issues(
+        self,
+        file_path: Path,
+        base_ref: str,
+        parser: DependencyParser,
+        ignored: FrozenSet[str],
+        contents: Optional[Tuple[str, Optional[str]]] = None,
+    ) -> List[Issue]:
+        """Issues for one file, contents as for get_dependency_changes"""
         try:
-            changes = self.get_dependency_changes(file_path, base_ref)
+            changes = self.get_dependency_changes(
+                file_path, base_ref, parser=parser, contents=contents
+            )
             issues = []
 
             for change in changes:
-                if self._should_ignore_package(change.package_name):
+                if change.package_name in ignored:
                     continue
 
                 issues.extend(self._process_dependency_change(change, parser))
@@ -198,9 +746,27 @@ class VersionDetector:
             return issues
 
         except Exception as e:
-            print(f"Error processing {file_path}: {e}", file=sys.stderr)
+            logger.error("Error processing %s: %s", file_path, e)
             return []
 
+    def _result_key(
+        self,
+        parser: DependencyParser,
+        file_path: Path,
+        current_content: str,
+        old_content: Optional[str],
+    ) -> bytes:
+        """Result cache key covering bvd, the parser, both file versions and the config"""
+        return ResultCache.key(
+            parser.name,
+            parser.version,
+            str(file_path),
+            current_content,
+            # Distinguish a new file from an empty old one
+            "\0" if old_content is None else "\1" + old_content,
+            self._config_key,
+        )
+
     def _process_dependency_change(
         self, change: VersionChange, parser: DependencyParser
     ) -> List[Issue]:
@@ -223,52 +789,46 @@ class VersionDetector:
 
     def report_issues(self, issues: List[Issue], format: str = "") -> str:
         """Generate report of issues"""
-        if format == "json":
-            return json.dumps(
-                [
-                    {
-                        "severity": issue.severity.value,
-                        "type": issue.issue_type.value,
-                        "message": issue.message,
-                        "file": issue.change.file_path,
-                        "package": issue.change.package_name,
-                        "suggestion": issue.suggestion,
-                    }
-                    for issue in issues
-                ],
-                indent=2,
-            )
+        if not issues:
+            # Clean runs are the common case, JSON consumers still get a valid document
+            return "[]" if format == "json" else ""
 
-        # Text format
-        report = []
-        for issue in issues:
-            report.append(
-                f"{issue.severity.to_emoji()} {issue.severity.value.upper()}: {issue.message}"
-            )
-            report.append(f"   File: {issue.change.file_path}")
-            report.append(f"   Package: {issue.change.package_name}")
-            if issue.suggestion:
-                report.append(f"   Suggestion: {issue.suggestion}")
-            report.append("")
-
-        return "\n".join(report)
+        if format == "json":
+            records = [issue.to_dict() for issue in issues]
+            # orjson is optional, it encodes large reports much faster than the stdlib
+            if orjson is not None:
+                return orjson.dumps(records, option=orjson.OPT_INDENT_2).decode()
+            return json.dumps(records, indent=2)
+
+        # Text format, one block per issue separated by a blank line
+        # Severity prefixes are built once per report rather than once per issue
+        labels = {sev: f"{SEVERITY_EMOJI[sev]} {sev.value.upper()}" for sev in Severity}
+        blocks = (
+            f"{labels[issue.severity]}: {issue.message}\n"
+            f"   File: {issue.change.file_path}\n"
+            f"   Package: {issue.change.package_name}"
+            + (f"\n   Suggestion: {issue.suggestion}" if issue.suggestion else "")
+            for issue in issues
+        )
+        return "\n\n".join(blocks) + "\n"
 
-    def _should_ignore_package(self, package_name: str) -> bool:
-        """Check if a package should be ignored based on configuration"""
-        ignore_packages = self.config.get("ignore_packages") or []
-        return package_name in ignore_packages
+    def _ignored_packages(self) -> FrozenSet[str]:
+        """Packages to skip based on configuration, as a set for constant time lookups"""
+        return frozenset(self.config.get("ignore_packages") or ())
 
-    def _resolve_severity(self, base_severity: Severity, package_name: str) -> Severity:
+    def _severity(self, package_name: str, issue_type: IssueType) -> Severity:
         """Resolve final severity, considering critical package overrides"""
-        critical_packages = self.config.get("critical_packages") or {}
-        if package_name in critical_packages:
-            return critical_packages[package_name]
-        return base_severity
+        key = (package_name, issue_type)
+        severity = self._severity_cache.get(key)
+        if severity is None:
+            critical_packages = self.config.get("critical_packages") or {}
+            severity = critical_packages.get(package_name, self.config["rules"][issue_type])
+            self._severity_cache[key] = severity
+        return severity
 
     def _create_unbound_version_issue(self, change: VersionChange) -> Optional[Issue]:
         """Create an issue for unbound version constraints"""
-        base_severity = self.config["rules"][IssueType.UNBOUND_VERSION]
-        severity = self._resolve_severity(base_severity, change.package_name)
+        severity = self._severity(change.package_name, IssueType.UNBOUND_VERSION)
         suggestion = self._get_unbound_constraint_suggestion(change)
         message = f"Unbound version constraint '{change.new_constraint}' for {change.package_name}"
 
@@ -288,52 +848,12 @@ class VersionDetector:
         if not issue_type:  # pragma: no cover
             return None
 
-        base_severity = self.config["rules"][issue_type]
-        severity = self._resolve_severity(base_severity, change.package_name)
-
-        # Generate explicit messages based on issue type
-        if "downgrade" in issue_type.value:
-            if issue_type == IssueType.MAJOR_VERSION_DOWNGRADE:
-                message = (
-                    f"Major version downgrade detected: {change.package_name} "
-                    f"downgraded from {change.old_version} to {change.new_version} - "
-                    f"potential feature loss and security vulnerabilities"
-                )
-                suggestion = (
-                    f"Review {change.package_name} changelog for removed features and fixes. "
-                    f"Verify your code doesn't depend on features from {change.old_version}. "
-                    "Consider security implications of missing patches."
-                )
-            elif issue_type == IssueType.MINOR_VERSION_DOWNGRADE:
-                message = (
-                    f"Minor version downgrade detected: {change.package_name} "
-                    f"downgraded from {change.old_version} to {change.new_version} - "
-                    f"potential feature loss and missing bug fixes"
-                )
-                suggestion = (
-                    f"Review {change.package_name} changelog for removed features and bug fixes. "
-                    f"Verify your code doesn't depend on features from {change.old_version}."
-                )
-            else:  # PATCH_VERSION_DOWNGRADE
-                message = (
-                    f"Patch version downgrade detected: {change.package_name} "
-                    f"downgraded from {change.old_version} to {change.new_version} - "
-                    f"missing bug fixes and security patches"
-                )
-                suggestion = (
-                    f"Review {change.package_name} changelog for bug fixes and security patches "
-                    f"that may be missing in version {change.new_version}."
-                )
-        else:
-            # Original upgrade messages
-            message = (
-                f"{issue_type.value.replace('_', ' ').title()} detected: "
-                f"{change.package_name} changed from {change.old_version} to {change.new_version}"
-            )
-            suggestion = (
-                f"Review breaking changes in {change.package_name} changelog "
-                f"between versions {change.old_version} and {change.new_version}"
-            )
+        severity = self._severity(change.package_name, issue_type)
+
+        message_template, suggestion_template = _VERSION_CHANGE_TEMPLATES[issue_type]
+        fields = {"pkg": change.package_name, "old": change.old_version, "new": change.new_version}
+        message = message_template.format_map(fields)
+        suggestion = suggestion_template.format_map(fields)
 
         return Issue(
             severity=severity,
@@ -4,7 +4,7 @@ Abstract base classes for dependency parsers
 
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Pattern
 
 from ..semver import extract_version_from_constraint
 from ..types import VersionChange
@@ -13,6 +13,13 @@ from ..types import VersionChange
 class DependencyParser(ABC):  # pragma: no cover
     """Abstract base class for dependency file parsers"""
 
+    # Matches lines that can affect parsed dependencies. When set, edits that only touch
+    # other lines (comments, blank lines) skip re-parsing the old file. None disables this.
+    dependency_line_re: Optional[Pattern[str]] = None
+
+    # Part of the persistent result cache key, bump when parsing output changes
+    version: str = "1"
+
     @property
     @abstractmethod
     def supported_files(self) -> List[str]:
@@ -2,21 +2,44 @@
 Terraform provider dependency parser
 """
 
+import logging
 import re
 import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import List
-
-import hcl2
+from typing import Any, Dict, List, Optional, Tuple
 
 from ..semver import extract_version_from_constraint, is_valid_semver
 from ..types import VersionChange
 from .base import DependencyParser
 
+logger = logging.getLogger(__name__)
+
+_NOT_IMPORTED: Any = object()
+# python-hcl2 (and lark under it) is a large share of CLI startup and plain files never
+# need it, so it is imported on first use, None when it is not installed
+hcl2: Any = _NOT_IMPORTED
+
+
+def _hcl2() -> Any:
+    """The hcl2 module, imported on first call"""
+    global hcl2
+    if hcl2 is _NOT_IMPORTED:
+        try:
+            import hcl2 as module
+        except ImportError:
+            module = None
+        hcl2 = module
+    return hcl2
+
 
 class TerraformParser(DependencyParser):
     """Parser for Terraform provider dependencies"""
 
+    # Everything but blank lines and whole-line comments, lines that open or close a
+    # block comment always count since they change what the rest of the file means
+    dependency_line_re = re.compile(r"^\s*(?!#|//)\S|/\*|\*/")
+
     @property
     def supported_files(self) -> List[str]:
         return ["*.tf", "versions.tf", "main.tf", "providers.tf"]
@@ -32,66 +55,212 @@ class TerraformParser(DependencyParser):
         changes = []
 
         try:
-            # Parse HCL content
-            parsed = hcl2.loads(content)
-
-            # Extract provider requirements
-            terraform_blocks = parsed.get("terraform", [])
-            for tf_block in terraform_blocks:
-                if isinstance(tf_block, dict) and "required_providers" in tf_block:
-                    providers = tf_block["required_providers"]
-                    if isinstance(providers, list):
-                        providers = providers[0]
-
-                    for provider_name, provider_config in providers.items():
-                        if isinstance(provider_config, dict) and "version" in provider_config:
-                            version_constraint = provider_config["version"]
-                            source = provider_config.get("source", provider_name)
-
-                            changes.append(
-                                VersionChange(
-                                    package_name=source,
-                                    old_version=None,  # Will be populated by diff logic
-                                    new_version=self.extract_version(version_constraint)
-                                    or version_constraint,
-                                    old_constraint=None,
-                                    new_constraint=version_constraint,
-                                    file_path=str(file_path),
-                                )
-                            )
+            # Plain versions.tf style files are read by the fast scanner, anything it
+            # does not fully understand goes through the complete HCL parser
+            providers = _scan_required_providers(content)
+            if providers is None:
+                logger.debug("%s needs the full HCL parser", file_path)
+                if _hcl2() is None:
+                    raise ImportError("python-hcl2 is not installed")
+                providers = _required_providers(_load_hcl(content))
+
+            for source, version_constraint in providers:
+                changes.append(
+                    VersionChange(
+                        package_name=source,
+                        old_version=None,  # Will be populated by diff logic
+                        new_version=self.extract_version(version_constraint) or version_constraint,
+                        old_constraint=None,
+                        new_constraint=version_constraint,
+                        file_path=str(file_path),
+                    )
+                )
 
         except Exception as e:
-            print(f"Error parsing {file_path}: {e}", file=sys.stderr)
+            logger.error("Error parsing %s: %s", file_path, e)
 
         return changes
 
     def is_version_bound(self, constraint: str) -> bool:
         """Check if Terraform version constraint properly bounds major version"""
-        constraint = constraint.strip()
-
-        # Unbound patterns that don't limit major version upgrades
-        unbound_patterns = [
-            r"^\s*>=\s*",  # >= without upper bound
-            r"^\s*>\s*",  # > without upper bound
-            r"^\s*\*\s*$",  # Just *
-        ]
-
-        for pattern in unbound_patterns:
-            if re.match(pattern, constraint):
-                return False
-
-        # Check if we have a bound operator and valid version
-        bound_operators = [
-            r"^\s*~>\s*",  # ~> pessimistic operator
-            r"^\s*=\s*",  # = exact version
-            r"^\s*\d+",  # plain version without operator
-        ]
-
-        for operator_pattern in bound_operators:
-            if re.match(operator_pattern, constraint):
-                # Extract the version part and validate it
-                version_str = extract_version_from_constraint(constraint)
-                if version_str and is_valid_semver(version_str):
-                    return True
+        return _is_version_bound(constraint)
+
+
+@lru_cache(maxsize=512)
+def _load_hcl(content: str) -> dict:
+    """Parse HCL once per distinct content, the same files recur across paths and runs
+
+    The result is shared between callers and must not be modified.
+    """
+    return _hcl2().loads(content)
+
+
+def _required_providers(parsed: dict) -> List[Tuple[Any, Any]]:
+    """(source, version constraint) of every versioned provider in an hcl2 parse"""
+    providers = []
+    terraform_blocks = parsed.get("terraform", [])
+    for tf_block in terraform_blocks:
+        if isinstance(tf_block, dict) and "required_providers" in tf_block:
+            required = tf_block["required_providers"]
+            if isinstance(required, list):
+                required = required[0]
+
+            for provider_name, provider_config in required.items():
+                if isinstance(provider_config, dict) and "version" in provider_config:
+                    source = provider_config.get("source", provider_name)
+                    providers.append((source, provider_config["version"]))
+    return providers
+
+
+# Tokens of the HCL subset the fast scanner accepts: names, plain strings without
+# escapes or templates, and = { } , punctuation. Anything else rejects the file.
+_HCL_TOKEN = re.compile(
+    r"(?P<nl>\n)|[ \t]+|(?P<name>[A-Za-z_][A-Za-z0-9_-]*)"
+    r"|\"(?P<str>[^\"\\\n$%]*)\"|(?P<punct>[={},])"
+)
+
+
+class _Unsupported(Exception):
+    """Content outside the subset understood by _scan_required_providers"""
+
+
+def _scan_required_providers(content: str) -> Optional[List[Tuple[str, str]]]:
+    """Read providers from simple Terraform files without building an HCL parse tree
 
+    Only accepts files made of blocks, string attributes and objects of string
+    attributes, laid out one item per line, which covers typical versions.tf files.
+    Returns None for anything else so the caller can fall back to hcl2.
+    """
+    tokens: List[Tuple[str, str]] = []
+    pos = 0
+    while pos < len(content):
+        match = _HCL_TOKEN.match(content, pos)
+        if match is None:
+            return None
+        pos = match.end()
+        kind = match.lastgroup
+        if kind is None or (kind == "nl" and tokens and tokens[-1][0] == "nl"):
+            continue
+        tokens.append((kind, match.group(kind)))
+    tokens.append(("eof", ""))
+
+    try:
+        top, end = _scan_body(tokens, 0)
+        if tokens[end][0] != "eof":
+            return None
+    except _Unsupported:
+        return None
+
+    providers = []
+    for labels, tf_body in top["blocks"].get("terraform", []):
+        if labels or "required_providers" in tf_body["attrs"]:
+            return None
+        required = tf_body["blocks"].get("required_providers")
+        if not required:
+            continue
+        labels, required_body = required[0]
+        if labels or required_body["blocks"]:
+            return None
+
+        for provider_name, provider_config in required_body["attrs"].items():
+            if isinstance(provider_config, dict) and "version" in provider_config:
+                source = provider_config.get("source", provider_name)
+                # The same sources and constraints recur across files, share one copy
+                providers.append((sys.intern(source), sys.intern(provider_config["version"])))
+    return providers
+
+
+def _scan_body(tokens: List[Tuple[str, str]], i: int) -> Tuple[Dict[str, Any], int]:
+    """Scan block items up to a closing brace or the end of input"""
+    attrs: Dict[str, Any] = {}
+    blocks: Dict[str, List[Tuple[List[str], Dict[str, Any]]]] = {}
+    if tokens[i][0] == "nl":
+        i += 1
+
+    while tokens[i][0] == "name":
+        name = tokens[i][1]
+        i += 1
+        if tokens[i] == ("punct", "="):
+            if name in attrs or name in blocks:
+                raise _Unsupported(name)
+            if tokens[i + 1][0] == "str":
+                attrs[name] = tokens[i + 1][1]
+                i += 2
+            else:
+                attrs[name], i = _scan_object(tokens, i + 1)
+        else:
+            if name in attrs:
+                raise _Unsupported(name)
+            labels = []
+            while tokens[i][0] == "str":
+                labels.append(tokens[i][1])
+                i += 1
+            if tokens[i] != ("punct", "{") or tokens[i + 1][0] != "nl":
+                raise _Unsupported(name)
+            body, i = _scan_body(tokens, i + 2)
+            if tokens[i] != ("punct", "}"):
+                raise _Unsupported(name)
+            blocks.setdefault(name, []).append((labels, body))
+            i += 1
+
+        # Every item ends its line
+        if tokens[i][0] == "nl":
+            i += 1
+        elif tokens[i][0] != "eof":
+            raise _Unsupported(name)
+
+    return {"attrs": attrs, "blocks": blocks}, i
+
+
+def _scan_object(tokens: List[Tuple[str, str]], i: int) -> Tuple[Dict[str, str], int]:
+    """Scan an object of string attributes, separated by commas or newlines"""
+    if tokens[i] != ("punct", "{"):
+        raise _Unsupported("object")
+    i += 1
+    if tokens[i][0] == "nl":
+        i += 1
+
+    values: Dict[str, str] = {}
+    while tokens[i] != ("punct", "}"):
+        if (
+            tokens[i][0] != "name"
+            or tokens[i + 1] != ("punct", "=")
+            or tokens[i + 2][0] != "str"
+            or tokens[i][1] in values
+        ):
+            raise _Unsupported("object")
+        values[tokens[i][1]] = tokens[i + 2][1]
+        i += 3
+
+        if tokens[i] == ("punct", ","):
+            i += 1
+            if tokens[i][0] == "nl":
+                i += 1
+            if tokens[i] == ("punct", "}"):
+                # Trailing commas are left to the full parser
+                raise _Unsupported("object")
+        elif tokens[i][0] == "nl":
+            i += 1
+        elif tokens[i] != ("punct", "}"):
+            raise _Unsupported("object")
+
+    return values, i + 1
+
+
+# Leading operator of a constraint, classified in a single match. Unbound operators
+# (> and >= without an upper bound, a lone *) are listed first so they win over "=".
+_CONSTRAINT_KIND = re.compile(r"(?P<unbound>>|\*\Z)|(?P<bound>~>|=|\d)", re.ASCII)
+
+
+@lru_cache(maxsize=4096)
+def _is_version_bound(constraint: str) -> bool:
+    """Classify a constraint once, the same constraints recur across providers and files"""
+    constraint = constraint.strip()
+
+    match = _CONSTRAINT_KIND.match(constraint)
+    if not match or match.lastgroup == "unbound":
         return False
+
+    # Bound operator (~>, = or a plain version), the version itself must be valid
+    version_str = extract_version_from_constraint(constraint)
+    return bool(version_str and is_valid_semver(version_str))
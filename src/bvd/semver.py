@@ -3,11 +3,17 @@ Semantic version utilities for dependency parsers
 """
 
 import re
+from functools import lru_cache
 from typing import Optional
 
 from packaging import version
 
+# Support full semver (1.2.3), incomplete versions (1.2), and major-only (1).
+# ASCII only, other Unicode digits never form a valid version.
+_SEMVER_RE = re.compile(r"(\d+(?:\.\d+)?(?:\.\d+)?(?:-[a-zA-Z0-9\-\.]+)?)", re.ASCII)
 
+
+@lru_cache(maxsize=4096)
 def extract_version_from_constraint(constraint: str) -> Optional[str]:
     """
     Extract actual version from constraint string.
@@ -24,12 +30,37 @@ def extract_version_from_constraint(constraint: str) -> Optional[str]:
     Returns:
         Extracted version string or None if no valid version found
     """
-    # Support full semver (1.2.3), incomplete versions (1.2), and major-only (1)
-    semver_pattern = r"(\d+(?:\.\d+)?(?:\.\d+)?(?:-[a-zA-Z0-9\-\.]+)?)"
-    match = re.search(semver_pattern, constraint)
+    match = _SEMVER_RE.search(constraint)
     return match.group(1) if match else None
 
 
+@lru_cache(maxsize=4096)
+def _parse_version(version_str: str) -> Optional[version.Version]:
+    """
+    Parse a version string, memoizing the result.
+
+    The same version strings recur across files and scans, so each one is
+    parsed once. Invalid strings are cached as None rather than re-raising.
+    """
+    try:
+        return version.parse(version_str)
+    except version.InvalidVersion:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _release_triple(version_str: str) -> Optional[tuple[int, int, int]]:
+    """
+    (major, minor, micro) of a version string, memoized.
+
+    Saves going through the Version properties again on every comparison.
+    """
+    parsed = _parse_version(version_str)
+    if parsed is None:
+        return None
+    return (parsed.major, parsed.minor, parsed.micro)
+
+
 def is_valid_semver(version_str: str) -> bool:
     """
     Check if a version string is valid semver using packaging library.
@@ -40,11 +71,7 @@ def is_valid_semver(version_str: str) -> bool:
     Returns:
         True if valid semver, False otherwise
     """
-    try:
-        version.parse(version_str)
-        return True
-    except version.InvalidVersion:
-        return False
+    return _parse_version(version_str) is not None
 
 
 def normalize_version(version_str: str) -> Optional[str]:
@@ -62,11 +89,8 @@ def normalize_version(version_str: str) -> Optional[str]:
     Returns:
         Normalized version string or None if invalid
     """
-    try:
-        parsed = version.parse(version_str)
-        return str(parsed)
-    except version.InvalidVersion:
-        return None
+    parsed = _parse_version(version_str)
+    return str(parsed) if parsed is not None else None
 
 
 def compare_versions(old_ver: str, new_ver: str) -> Optional[tuple[int, int, int]]:
@@ -80,14 +104,13 @@ def compare_versions(old_ver: str, new_ver: str) -> Optional[tuple[int, int, int
     Returns:
         Tuple of (major_diff, minor_diff, patch_diff) or None if versions are invalid
     """
-    try:
-        old_v = version.parse(old_ver)
-        new_v = version.parse(new_ver)
+    old_v = _release_triple(old_ver)
+    new_v = _release_triple(new_ver)
+    if old_v is None or new_v is None:
+        return None
 
-        major_diff = new_v.major - old_v.major
-        minor_diff = new_v.minor - old_v.minor
-        patch_diff = new_v.micro - old_v.micro
+    major_diff = new_v[0] - old_v[0]
+    minor_diff = new_v[1] - old_v[1]
+    patch_diff = new_v[2] - old_v[2]
 
-        return (major_diff, minor_diff, patch_diff)
-    except version.InvalidVersion:
-        return None
+    return (major_diff, minor_diff, patch_diff)
@@ -4,7 +4,7 @@ Data types and enums for the Breaking Version Detector
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from typing import Dict, Optional
 
 
 class Severity(Enum):
@@ -14,12 +14,16 @@ class Severity(Enum):
     CRITICAL = "critical"
 
     def to_emoji(self) -> str:
-        return {
-            Severity.INFO: "ℹ️",
-            Severity.WARNING: "⚠️",
-            Severity.ERROR: "❌",
-            Severity.CRITICAL: "🚨",
-        }[self]
+        return SEVERITY_EMOJI[self]
+
+
+# Built once at import instead of on every to_emoji() call
+SEVERITY_EMOJI = {
+    Severity.INFO: "ℹ️",
+    Severity.WARNING: "⚠️",
+    Severity.ERROR: "❌",
+    Severity.CRITICAL: "🚨",
+}
 
 
 class IssueType(Enum):
@@ -33,7 +37,7 @@ class IssueType(Enum):
     LOOSE_CONSTRAINT = "loose_constraint"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class VersionChange:
     package_name: str
     old_version: Optional[str]
@@ -44,10 +48,21 @@ class VersionChange:
     line_number: Optional[int] = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Issue:
     severity: Severity
     issue_type: IssueType
     message: str
     change: VersionChange
     suggestion: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Optional[str]]:
+        """JSON report record for this issue"""
+        return {
+            "severity": self.severity.value,
+            "type": self.issue_type.value,
+            "message": self.message,
+            "file": self.change.file_path,
+            "package": self.change.package_name,
+            "suggestion": self.suggestion,
+        }
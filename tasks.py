@@ -5,7 +5,10 @@ This file replaces the Makefile and provides the same functionality using invoke
 Run `invoke --list` to see all available tasks.
 """
 
-from invoke import task
+import shlex
+import sys
+
+from invoke import Exit, task
 
 
 @task
@@ -14,6 +17,17 @@ def format(c):
     c.run("uv run ruff format src/ tests/")
 
 
+@task(name="format-changed")
+def format_changed(c):
+    """Format only the Python files changed since HEAD with ruff."""
+    result = c.run("git diff -z --name-only --diff-filter=ACM HEAD", hide=True)
+    files = [name for name in result.stdout.split("\0") if name.endswith(".py")]
+    if not files:
+        print("No changed Python files")
+        return
+    c.run("uv run ruff format " + " ".join(shlex.quote(name) for name in files))
+
+
 @task
 def lint(c):
     """Check code style and quality with ruff."""
@@ -27,14 +41,23 @@ def lint_fix(c):
 
 
 @task
-def test(c, cov=False, xml=False):
+def test(c, cov=False, xml=False, workers="auto", cached=False, verbose=False):
     """Run all tests with pytest.
 
     Args:
         cov: Run with coverage report (--cov)
         xml: Run with XML coverage report for CI (--xml)
+        workers: Number of parallel test processes, "auto" for one per CPU (--workers)
+        cached: Keep .pytest_cache for --lf/--ff reruns (--cached)
+        verbose: Show the pytest header and one line per test (--verbose)
     """
-    cmd = "uv run pytest"
+    # loadfile keeps each test module on one worker so its fixtures are set up once
+    cmd = f"uv run pytest -n {workers} --dist=loadfile"
+
+    if not cached:
+        cmd += " -p no:cacheprovider"
+
+    cmd += " -v" if verbose else " --no-header -q"
 
     if xml:
         cmd += " --cov=bvd --cov-report=xml"
@@ -45,6 +68,28 @@ def test(c, cov=False, xml=False):
     c.run(cmd)
 
 
+@task
+def check(c):
+    """Check formatting and lint concurrently, then run all tests."""
+    # Both ruff commands are read-only, so they can overlap
+    promises = [
+        c.run("uv run ruff format --check src/ tests/", asynchronous=True, hide=True, warn=True),
+        c.run("uv run ruff check src/ tests/", asynchronous=True, hide=True, warn=True),
+    ]
+    results = [promise.join() for promise in promises]
+
+    # Output was captured so the two reports do not interleave
+    for result in results:
+        print(result.stdout, end="")
+        print(result.stderr, end="", file=sys.stderr)
+
+    failed = [result.command for result in results if result.failed]
+    if failed:
+        raise Exit(f"Failed: {', '.join(failed)}")
+
+    test(c)
+
+
 @task
 def build(c):
     """Build the package."""
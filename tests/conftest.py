@@ -0,0 +1,20 @@
+"""
+Shared fixtures for the BVD test suite
+"""
+
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+
+@pytest.fixture
+def write_tf(tmp_path: Path) -> Callable[..., Path]:
+    """Write UTF-8 Terraform content into the test's tmp_path and return the file"""
+
+    def write(content: str, name: str = "main.tf") -> Path:
+        path = tmp_path / name
+        path.write_text(content, encoding="utf-8")
+        return path
+
+    return write
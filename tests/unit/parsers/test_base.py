@@ -71,27 +71,30 @@ class TestDependencyParserAbstractInterface:
         assert parser.extract_version("= 1.0.0") == "1.0.0"
 
 
-class TestAbstractMethodEnforcement:
-    """Test that abstract methods are properly enforced during inheritance"""
-
-    def test_incomplete_implementation_fails(self):
-        """Test that partial implementations cannot be instantiated"""
-
-        # Missing all abstract methods
-        class EmptyParser(DependencyParser):
-            pass
+# Implementations of every abstract method, left out one at a time below
+COMPLETE_IMPLEMENTATION = {
+    "supported_files": property(lambda self: ["*.partial"]),
+    "name": property(lambda self: "Partial Parser"),
+    "parse_dependencies": lambda self, file_path, content: [],
+    "is_version_bound": lambda self, constraint: True,
+}
 
-        with pytest.raises(TypeError):
-            EmptyParser()
 
-        # Missing some abstract methods
-        class PartialParser(DependencyParser):
-            @property
-            def supported_files(self):
-                return ["*.partial"]
+class TestAbstractMethodEnforcement:
+    """Test that abstract methods are properly enforced during inheritance"""
 
-        with pytest.raises(TypeError):
-            PartialParser()
+    @pytest.mark.parametrize("missing", [None, *sorted(COMPLETE_IMPLEMENTATION)])
+    def test_incomplete_implementation_fails(self, missing):
+        """Test that leaving out any abstract method prevents instantiation"""
+        if missing is None:
+            # Missing all abstract methods
+            attrs = {}
+        else:
+            attrs = {k: v for k, v in COMPLETE_IMPLEMENTATION.items() if k != missing}
+        partial_parser = type("PartialParser", (DependencyParser,), attrs)
+
+        with pytest.raises(TypeError, match="abstract method"):
+            partial_parser()
 
     def test_complete_implementation_succeeds(self):
         """Test that complete implementations work correctly"""
@@ -0,0 +1,195 @@
+"""
+Tests for the persistent result cache
+"""
+
+import sqlite3
+from unittest.mock import patch
+
+import bvd.core
+from bvd import IssueType, Severity, VersionDetector
+from bvd.cache import CACHE_TTL_SECONDS, ResultCache, config_digest, default_cache_path
+from bvd.core import Issue, VersionChange
+
+
+def make_issue(package_name="hashicorp/aws"):
+    change = VersionChange(package_name, "4.0.0", "5.0.0", "~> 4.0", "~> 5.0", "main.tf")
+    return Issue(Severity.CRITICAL, IssueType.MAJOR_VERSION_BUMP, "Major bump", change, "Review")
+
+
+class TestResultCache:
+    """Test storing and retrieving cached results"""
+
+    def test_round_trip(self, tmp_path):
+        """Test that stored issues come back equal after reopening the database"""
+        path = tmp_path / "results.db"
+        key = ResultCache.key("Terraform", "main.tf")
+
+        cache = ResultCache(path)
+        assert cache.get(key) is None
+        cache.put(key, [make_issue()])
+        cache.close()
+
+        cache = ResultCache(path)
+        assert cache.get(key) == [make_issue()]
+        cache.close()
+
+    def test_empty_result_is_a_hit(self, tmp_path):
+        """Test that files without issues are cached too"""
+        cache = ResultCache(tmp_path / "results.db")
+        key = ResultCache.key("clean.tf")
+
+        cache.put(key, [])
+        assert cache.get(key) == []
+        assert (cache.hits, cache.misses) == (1, 0)
+
+    def test_expired_entries_are_ignored(self, tmp_path):
+        """Test that entries older than the TTL count as misses"""
+        cache = ResultCache(tmp_path / "results.db")
+        key = ResultCache.key("main.tf")
+
+        with patch("bvd.cache.time.time", return_value=1_000_000):
+            cache.put(key, [make_issue()])
+        with patch("bvd.cache.time.time", return_value=1_000_000 + CACHE_TTL_SECONDS + 1):
+            assert cache.get(key) is None
+
+    def test_oldest_entries_pruned_on_open(self, tmp_path):
+        """Test that the database is capped to the newest entries"""
+        path = tmp_path / "results.db"
+        cache = ResultCache(path)
+        for i in range(5):
+            with patch("bvd.cache.time.time", return_value=1_000_000 + i):
+                cache.put(ResultCache.key(str(i)), [])
+        cache.close()
+
+        with (
+            patch("bvd.cache.CACHE_MAX_ENTRIES", 2),
+            patch("bvd.cache.time.time", return_value=1_000_010),
+        ):
+            cache = ResultCache(path)
+            assert cache.get(ResultCache.key("4")) == []
+            assert cache.get(ResultCache.key("3")) == []
+            assert cache.get(ResultCache.key("2")) is None
+
+    def test_unusable_path_disables_cache(self, tmp_path, caplog):
+        """Test that a cache that cannot be opened turns into a no-op"""
+        blocker = tmp_path / "file"
+        blocker.write_text("not a directory")
+
+        cache = ResultCache(blocker / "results.db")
+        cache.put(b"key", [])
+        assert cache.get(b"key") is None
+        cache.close()
+
+        assert "Result cache disabled" in caplog.text
+
+    def test_corrupt_entry_does_not_fail_scan(self, tmp_path, caplog):
+        """Test that an undecodable row disables the cache and the scan still runs"""
+        tf_file = tmp_path / "main.tf"
+        tf_file.write_text(
+            'terraform {\n  required_providers {\n    aws = {\n      source = "hashicorp/aws"\n'
+            '      version = ">= 5.0.0"\n    }\n  }\n}\n'
+        )
+        config = {"cache": True, "cache_path": tmp_path / "results.db"}
+
+        detector = VersionDetector(config)
+        with patch.object(detector, "get_file_content_at_ref", return_value=None):
+            issues = detector.detect_issues([tf_file])
+        detector.close()
+
+        # A malformed JSON record, an issue type this version does not know and no change
+        conn = sqlite3.connect(tmp_path / "results.db")
+        conn.execute("UPDATE results SET issues = ?", (b'[{"severity": "error", "type": "?"}]',))
+        conn.commit()
+        conn.close()
+
+        detector = VersionDetector(config)
+        with patch.object(detector, "get_file_content_at_ref", return_value=None):
+            assert detector.detect_issues([tf_file]) == issues
+        detector.close()
+
+        assert [issue.issue_type for issue in issues] == [IssueType.UNBOUND_VERSION]
+        assert "Result cache disabled" in caplog.text
+
+    def test_bvd_upgrade_invalidates_entries(self, tmp_path):
+        """Test that results cached by another bvd version are not served"""
+        tf_file = tmp_path / "main.tf"
+        tf_file.write_text(
+            'terraform {\n  required_providers {\n    aws = {\n      source = "hashicorp/aws"\n'
+            '      version = ">= 5.0.0"\n    }\n  }\n}\n'
+        )
+        config = {"cache": True, "cache_path": tmp_path / "results.db"}
+
+        for bvd_version, expected_misses in [("0.1.0", 1), ("0.1.0", 0), ("0.2.0", 1)]:
+            detector = VersionDetector(config)
+            with (
+                patch("bvd.__version__", bvd_version),
+                patch.object(detector, "get_file_content_at_ref", return_value=None),
+            ):
+                detector.detect_issues([tf_file])
+            assert detector._result_cache.misses == expected_misses
+            detector.close()
+
+    def test_miss_reads_each_file_version_once(self, tmp_path):
+        """Test that the contents loaded for the key are reused for the scan"""
+        tf_file = tmp_path / "main.tf"
+        tf_file.write_text(
+            'terraform {\n  required_providers {\n    aws = {\n      source = "hashicorp/aws"\n'
+            '      version = ">= 5.0.0"\n    }\n  }\n}\n'
+        )
+
+        with VersionDetector({"cache": True, "cache_path": tmp_path / "results.db"}) as detector:
+            with (
+                patch("bvd.core._read_file", wraps=bvd.core._read_file) as mock_read,
+                patch.object(detector, "get_file_content_at_ref", return_value=None) as mock_old,
+            ):
+                issues = detector.detect_issues([tf_file])
+
+            assert [issue.issue_type for issue in issues] == [IssueType.UNBOUND_VERSION]
+            assert (mock_read.call_count, mock_old.call_count) == (1, 1)
+
+    def test_parse_errors_are_not_cached(self, tmp_path, caplog):
+        """Test that a file that fails to parse reports the error on every run"""
+        tf_file = tmp_path / "main.tf"
+        tf_file.write_text("terraform {\n  required_providers {\n    aws = {\n")
+        config = {"cache": True, "cache_path": tmp_path / "results.db"}
+
+        for _ in range(2):
+            caplog.clear()
+            with VersionDetector(config) as detector:
+                with patch.object(detector, "get_file_content_at_ref", return_value=None):
+                    assert detector.detect_issues([tf_file]) == []
+                assert detector._result_cache.misses == 1
+
+            assert "Error parsing" in caplog.text
+
+    def test_default_path_honours_xdg_cache_home(self, tmp_path):
+        """Test the default database location"""
+        with patch.dict("os.environ", {"XDG_CACHE_HOME": str(tmp_path)}):
+            assert default_cache_path() == tmp_path / "bvd" / "results.db"
+
+
+class TestCacheKeys:
+    """Test key derivation"""
+
+    def test_key_part_boundaries(self):
+        """Test that moving bytes between parts changes the key"""
+        assert ResultCache.key("ab", "c") != ResultCache.key("a", "bc")
+        assert ResultCache.key("a", b"b") == ResultCache.key("a", "b")
+
+    def test_config_digest(self):
+        """Test that the config digest is stable and sensitive to severities"""
+        config = {
+            "rules": {IssueType.MAJOR_VERSION_BUMP: Severity.CRITICAL},
+            "ignore_packages": ["hashicorp/random"],
+        }
+        same = {
+            "ignore_packages": ["hashicorp/random"],
+            "rules": {IssueType.MAJOR_VERSION_BUMP: Severity.CRITICAL},
+        }
+        changed = {
+            "rules": {IssueType.MAJOR_VERSION_BUMP: Severity.WARNING},
+            "ignore_packages": ["hashicorp/random"],
+        }
+
+        assert config_digest(config) == config_digest(same)
+        assert config_digest(config) != config_digest(changed)
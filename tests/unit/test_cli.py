@@ -2,7 +2,7 @@
 Tests for CLI functionality and parameter passing
 """
 
-import tempfile
+import logging
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -12,6 +12,18 @@ from bvd import IssueType, Severity
 from bvd.cli import check_file, main
 from bvd.core import Issue, VersionChange
 
+# Single provider without an upper bound, reported as one unbound version issue
+AWS_UNBOUND_TF = """
+terraform {
+  required_providers {
+    aws = {
+      source  = "hashicorp/aws"
+      version = ">= 4.0.0"
+    }
+  }
+}
+"""
+
 
 class TestCLIParameterPassing:
     """Test CLI parameter passing and functionality"""
@@ -35,32 +47,65 @@ class TestCLIParameterPassing:
             mock_detector.detect_issues.assert_called_once_with(None, "HEAD~3")
             assert result.exit_code == 0
 
-    def test_main_with_specific_files(self):
+    def test_main_with_specific_files(self, write_tf):
         """Test main CLI with specific files"""
         runner = CliRunner()
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".tf", delete=False) as f:
-            f.write("terraform {}")
-            temp_path = Path(f.name)
+        temp_path = write_tf("terraform {}")
+
+        with patch("bvd.cli.VersionDetector") as mock_detector_class:
+            mock_detector = MagicMock()
+            mock_detector_class.return_value = mock_detector
+            mock_detector.detect_issues.return_value = []
+            mock_detector.report_issues.return_value = ""
+
+            result = runner.invoke(main, ["--files", str(temp_path), "--base-ref", "HEAD~2"])
+
+            # Should call detect_issues with file paths and base_ref
+            args, kwargs = mock_detector.detect_issues.call_args
+            assert len(args[0]) == 1  # One file
+            assert args[0][0].name == temp_path.name
+            assert args[1] == "HEAD~2"  # base_ref
+            assert result.exit_code == 0
+
+    def test_main_with_changed_only(self):
+        """Test that --changed-only enables the changed_only config"""
+        runner = CliRunner()
+
+        with patch("bvd.cli.VersionDetector") as mock_detector_class:
+            mock_detector = MagicMock()
+            mock_detector_class.return_value = mock_detector
+            mock_detector.detect_issues.return_value = []
+            mock_detector.report_issues.return_value = ""
+
+            result = runner.invoke(main, ["--files", "main.tf", "--changed-only"])
 
-        try:
-            with patch("bvd.cli.VersionDetector") as mock_detector_class:
-                mock_detector = MagicMock()
-                mock_detector_class.return_value = mock_detector
-                mock_detector.detect_issues.return_value = []
-                mock_detector.report_issues.return_value = ""
+            mock_detector_class.assert_called_once_with({"changed_only": True})
+            assert result.exit_code == 0
 
-                result = runner.invoke(main, ["--files", str(temp_path), "--base-ref", "HEAD~2"])
+    def test_main_with_cache(self):
+        """Test that --cache and BVD_CACHE enable the persistent result cache"""
+        runner = CliRunner()
 
-                # Should call detect_issues with file paths and base_ref
-                args, kwargs = mock_detector.detect_issues.call_args
-                assert len(args[0]) == 1  # One file
-                assert args[0][0].name == temp_path.name
-                assert args[1] == "HEAD~2"  # base_ref
-                assert result.exit_code == 0
+        with patch("bvd.cli.VersionDetector") as mock_detector_class:
+            mock_detector = MagicMock()
+            mock_detector_class.return_value = mock_detector
+            mock_detector.detect_issues.return_value = []
+            mock_detector.report_issues.return_value = ""
 
-        finally:
-            temp_path.unlink()
+            result = runner.invoke(main, ["--files", "main.tf", "--cache"])
+            assert result.exit_code == 0
+            mock_detector_class.assert_called_with({"cache": True})
+
+            result = runner.invoke(main, ["--files", "main.tf"], env={"BVD_CACHE": "1"})
+            assert result.exit_code == 0
+            mock_detector_class.assert_called_with({"cache": True})
+
+            result = runner.invoke(
+                main, ["--files", "main.tf", "--no-cache"], env={"BVD_CACHE": "1"}
+            )
+            assert result.exit_code == 0
+            mock_detector_class.assert_called_with(None)
 
     def test_main_with_verbose_output(self):
         """Test main CLI with verbose flag"""
@@ -80,6 +125,11 @@ class TestCLIParameterPassing:
             assert "Breaking Version Detector starting..." in result.output
             assert "No issues found!" in result.output
             assert result.exit_code == 0
+            # Cache statistics are logged at debug level
+            assert logging.getLogger("bvd").level == logging.DEBUG
+
+            runner.invoke(main, [])
+            assert logging.getLogger("bvd").level == logging.NOTSET
 
     def test_main_exit_codes(self):
         """Test CLI exit codes for different scenarios"""
@@ -165,64 +215,53 @@ class TestCLIParameterPassing:
             assert "Usage:" in result.output
             assert result.exit_code == 0
 
-    def test_check_file_command(self):
+    def test_check_file_command(self, write_tf):
         """Test check_file command functionality"""
         runner = CliRunner()
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".tf", delete=False) as f:
-            f.write("terraform {}")
-            temp_path = Path(f.name)
-
-        try:
-            with patch("bvd.cli.VersionDetector") as mock_detector_class:
-                mock_detector = MagicMock()
-                mock_detector_class.return_value = mock_detector
-                mock_detector.detect_issues.return_value = []
-                mock_detector.report_issues.return_value = ""
+        temp_path = write_tf("terraform {}")
 
-                result = runner.invoke(check_file, [str(temp_path), "--base-ref", "HEAD~1"])
+        with patch("bvd.cli.VersionDetector") as mock_detector_class:
+            mock_detector = MagicMock()
+            mock_detector_class.return_value = mock_detector
+            mock_detector.detect_issues.return_value = []
+            mock_detector.report_issues.return_value = ""
 
-                # Should call detect_issues with file and base_ref
-                args, kwargs = mock_detector.detect_issues.call_args
-                assert len(args[0]) == 1
-                assert args[0][0].name == temp_path.name
-                assert args[1] == "HEAD~1"
+            result = runner.invoke(check_file, [str(temp_path), "--base-ref", "HEAD~1"])
 
-                assert "No issues found!" in result.output
-                assert result.exit_code == 0
+            # Should call detect_issues with file and base_ref
+            args, kwargs = mock_detector.detect_issues.call_args
+            assert len(args[0]) == 1
+            assert args[0][0].name == temp_path.name
+            assert args[1] == "HEAD~1"
 
-        finally:
-            temp_path.unlink()
+            assert "No issues found!" in result.output
+            assert result.exit_code == 0
 
-    def test_check_file_with_issues(self):
+    def test_check_file_with_issues(self, write_tf):
         """Test check_file command with issues found"""
         runner = CliRunner()
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".tf", delete=False) as f:
-            f.write("terraform {}")
-            temp_path = Path(f.name)
-
-        try:
-            issue = Issue(
-                severity=Severity.ERROR,
-                issue_type=IssueType.UNBOUND_VERSION,
-                message="Test issue",
-                change=VersionChange("test/pkg", None, "1.0.0", None, ">= 1.0.0", str(temp_path)),
-            )
+        temp_path = write_tf("terraform {}")
 
-            with patch("bvd.cli.VersionDetector") as mock_detector_class:
-                mock_detector = MagicMock()
-                mock_detector_class.return_value = mock_detector
-                mock_detector.detect_issues.return_value = [issue]
-                mock_detector.report_issues.return_value = "Error found"
+        issue = Issue(
+            severity=Severity.ERROR,
+            issue_type=IssueType.UNBOUND_VERSION,
+            message="Test issue",
+            change=VersionChange("test/pkg", None, "1.0.0", None, ">= 1.0.0", str(temp_path)),
+        )
 
-                result = runner.invoke(check_file, [str(temp_path)])
+        with patch("bvd.cli.VersionDetector") as mock_detector_class:
+            mock_detector = MagicMock()
+            mock_detector_class.return_value = mock_detector
+            mock_detector.detect_issues.return_value = [issue]
+            mock_detector.report_issues.return_value = "Error found"
 
-                assert "Error found" in result.output
-                assert result.exit_code == 1
+            result = runner.invoke(check_file, [str(temp_path)])
 
-        finally:
-            temp_path.unlink()
+            assert "Error found" in result.output
+            assert result.exit_code == 1
+            mock_detector.close.assert_called_once()
 
     def test_cli_error_handling(self):
         """Test CLI error handling"""
@@ -238,73 +277,41 @@ class TestCLIParameterPassing:
 
             assert "Error: Test error" in result.output
             assert result.exit_code == 1
+            # The git helper process is released on error exits too
+            mock_detector.close.assert_called_once()
 
 
 class TestCLIIntegration:
     """Integration tests for CLI with real functionality"""
 
-    def test_cli_end_to_end_text_output(self):
+    def test_cli_end_to_end_text_output(self, write_tf):
         """Test complete CLI workflow with text output"""
         runner = CliRunner()
 
-        terraform_content = """
-terraform {
-  required_providers {
-    aws = {
-      source  = "hashicorp/aws"
-      version = ">= 4.0.0"
-    }
-  }
-}
-"""
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".tf", delete=False) as f:
-            f.write(terraform_content)
-            temp_path = Path(f.name)
+        temp_path = write_tf(AWS_UNBOUND_TF)
 
-        try:
-            result = runner.invoke(main, ["--files", str(temp_path), "--format", "text"])
+        result = runner.invoke(main, ["--files", str(temp_path), "--format", "text"])
 
-            # Should find unbound version issue
-            assert "Unbound version constraint" in result.output
-            assert "hashicorp/aws" in result.output
-            assert result.exit_code == 1  # Error severity
+        # Should find unbound version issue
+        assert "Unbound version constraint" in result.output
+        assert "hashicorp/aws" in result.output
+        assert result.exit_code == 1  # Error severity
 
-        finally:
-            temp_path.unlink()
-
-    def test_cli_end_to_end_json_output(self):
+    def test_cli_end_to_end_json_output(self, write_tf):
         """Test complete CLI workflow with JSON output"""
         runner = CliRunner()
 
-        terraform_content = """
-terraform {
-  required_providers {
-    aws = {
-      source  = "hashicorp/aws"
-      version = ">= 4.0.0"
-    }
-  }
-}
-"""
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".tf", delete=False) as f:
-            f.write(terraform_content)
-            temp_path = Path(f.name)
+        temp_path = write_tf(AWS_UNBOUND_TF)
 
-        try:
-            result = runner.invoke(main, ["--files", str(temp_path), "--format", "json"])
+        result = runner.invoke(main, ["--files", str(temp_path), "--format", "json"])
 
-            # Should return valid JSON
-            assert '"severity":' in result.output
-            assert '"type":' in result.output
-            assert '"package":' in result.output
-            assert result.exit_code == 1
-
-        finally:
-            temp_path.unlink()
+        # Should return valid JSON
+        assert '"severity":' in result.output
+        assert '"type":' in result.output
+        assert '"package":' in result.output
+        assert result.exit_code == 1
 
-    def test_cli_with_bound_versions_no_issues(self):
+    def test_cli_with_bound_versions_no_issues(self, write_tf):
         """Test CLI with properly bound versions (no issues)"""
         runner = CliRunner()
 
@@ -323,18 +330,12 @@ terraform {
 }
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".tf", delete=False) as f:
-            f.write(terraform_content)
-            temp_path = Path(f.name)
+        temp_path = write_tf(terraform_content)
 
-        try:
-            result = runner.invoke(main, ["--files", str(temp_path), "--verbose"])
+        result = runner.invoke(main, ["--files", str(temp_path), "--verbose"])
 
-            assert "No issues found!" in result.output
-            assert result.exit_code == 0
-
-        finally:
-            temp_path.unlink()
+        assert "No issues found!" in result.output
+        assert result.exit_code == 0
 
     def test_cli_with_nonexistent_file(self):
         """Test CLI behavior with nonexistent file"""
@@ -345,7 +346,7 @@ terraform {
         # Click should handle file existence check
         assert result.exit_code != 0
 
-    def test_cli_verbose_with_multiple_issues(self):
+    def test_cli_verbose_with_multiple_issues(self, write_tf):
         """Test verbose output with multiple issues"""
         runner = CliRunner()
 
@@ -368,19 +369,13 @@ terraform {
 }
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".tf", delete=False) as f:
-            f.write(terraform_content)
-            temp_path = Path(f.name)
-
-        try:
-            result = runner.invoke(main, ["--files", str(temp_path), "--verbose"])
+        temp_path = write_tf(terraform_content)
 
-            assert "Breaking Version Detector starting..." in result.output
-            assert "Found 3 critical/error issues" in result.output
-            assert result.exit_code == 1
+        result = runner.invoke(main, ["--files", str(temp_path), "--verbose"])
 
-        finally:
-            temp_path.unlink()
+        assert "Breaking Version Detector starting..." in result.output
+        assert "Found 3 critical/error issues" in result.output
+        assert result.exit_code == 1
 
     def test_cli_verbose_warnings_only(self):
         """Test CLI verbose output when only warnings are found (coverage completion)"""
@@ -2,26 +2,21 @@
 Tests for core BVD functionality
 """
 
+import logging
+import os
 import subprocess
-import tempfile
+from dataclasses import replace
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from typing import List
+from unittest.mock import ANY, MagicMock, patch
 
-from bvd import IssueType, Severity, VersionDetector
-from bvd.core import Issue, VersionChange
-
-
-def test_version_detector():
-    """Test basic detector functionality"""
-    detector = VersionDetector()
-
-    # Should have terraform parser registered
-    assert "Terraform" in detector.parsers
+import pytest
 
+from bvd import IssueType, Severity, VersionDetector
+from bvd.core import PARALLEL_MIN_FILES, Issue, VersionChange
 
-def test_issue_detection():
-    """Test issue detection on a real file"""
-    terraform_content = """
+# Single provider without an upper bound, reported as one unbound version issue
+AWS_UNBOUND_TF = """
 terraform {
   required_providers {
     aws = {
@@ -32,44 +27,49 @@ terraform {
 }
 """
 
+
+def git_diff_outputs(names: bytes) -> List[MagicMock]:
+    """subprocess.run results for get_changed_files run at the repository root"""
+    return [MagicMock(stdout=os.fsencode(Path.cwd()) + b"\n"), MagicMock(stdout=names)]
+
+
+def test_version_detector():
+    """Test basic detector functionality"""
     detector = VersionDetector()
 
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".tf", delete=False) as f:
-        f.write(terraform_content)
-        temp_path = Path(f.name)
+    # Should have terraform parser registered
+    assert "Terraform" in detector.parsers
 
-    try:
-        issues = detector.detect_issues([temp_path])
 
-        # Should find 1 unbound version issue
-        assert len(issues) == 1
-        assert issues[0].issue_type == IssueType.UNBOUND_VERSION
-        # hashicorp/aws is in critical_packages, so severity is CRITICAL
-        assert issues[0].severity == Severity.CRITICAL
+def test_issue_detection(write_tf):
+    """Test issue detection on a real file"""
+    detector = VersionDetector()
+
+    temp_path = write_tf(AWS_UNBOUND_TF)
 
-    finally:
-        temp_path.unlink()
+    issues = detector.detect_issues([temp_path])
 
+    # Should find 1 unbound version issue
+    assert len(issues) == 1
+    assert issues[0].issue_type == IssueType.UNBOUND_VERSION
+    # hashicorp/aws is in critical_packages, so severity is CRITICAL
+    assert issues[0].severity == Severity.CRITICAL
 
-def test_detect_issues_no_matching_parser():
+
+def test_detect_issues_no_matching_parser(tmp_path):
     """Test issue detection when no parser matches file"""
     detector = VersionDetector()
 
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".unknown", delete=False) as f:
-        f.write("some unknown content")
-        temp_path = Path(f.name)
-
-    try:
-        issues = detector.detect_issues([temp_path])
+    temp_path = tmp_path / "main.unknown"
+    temp_path.write_text("some unknown content")
 
-        # Should find no issues since no parser matches
-        assert len(issues) == 0
+    issues = detector.detect_issues([temp_path])
 
-    finally:
-        temp_path.unlink()
+    # Should find no issues since no parser matches
+    assert len(issues) == 0
 
 
-def test_detect_issues_processing_error():
+def test_detect_issues_processing_error(write_tf):
     """Test error handling during issue detection"""
     detector = VersionDetector()
 
@@ -81,19 +81,99 @@ def test_detect_issues_processing_error():
 
     detector.parsers["ErrorParser"] = mock_parser
 
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".tf", delete=False) as f:
-        f.write("terraform {}")
-        temp_path = Path(f.name)
+    temp_path = write_tf("terraform {}")
 
-    try:
-        # Should handle error gracefully and continue with other parsers
-        issues = detector.detect_issues([temp_path])
+    # Should handle error gracefully and continue with other parsers
+    issues = detector.detect_issues([temp_path])
+
+    # Should still work with the real Terraform parser
+    assert isinstance(issues, list)
+
+
+def test_detect_issues_parallel_preserves_file_order(tmp_path):
+    """Test that files processed on the thread pool report issues in input order"""
+    detector = VersionDetector()
+
+    temp_paths = []
+    # Names sort differently from the input order
+    for i in reversed(range(6)):
+        temp_path = tmp_path / f"{i}.tf"
+        temp_path.write_text(
+            "terraform {\n  required_providers {\n"
+            f'    p{i} = {{\n      source  = "example/p{i}"\n'
+            f'      version = ">= {i}.0.0"\n    }}\n  }}\n}}\n'
+        )
+        temp_paths.append(temp_path)
+
+    issues = detector.detect_issues(temp_paths)
+
+    assert [issue.change.package_name for issue in issues] == [
+        f"example/p{i}" for i in reversed(range(6))
+    ]
+    assert [issue.change.file_path for issue in issues] == [str(p) for p in temp_paths]
+
+
+def test_detect_issues_worker_count():
+    """Test that the thread pool is sized to the batch and capped"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from bvd.core import MAX_WORKERS
+
+    detector = VersionDetector()
+
+    for count, expected in [(PARALLEL_MIN_FILES, PARALLEL_MIN_FILES), (50, MAX_WORKERS)]:
+        paths = [Path(f"mod{i}/main.tf") for i in range(count)]
+        with (
+            patch.object(detector, "_fetch_old_blobs", return_value={}),
+            patch.object(detector, "_process_file_for_issues", return_value=[]),
+            patch("bvd.core.ThreadPoolExecutor", wraps=ThreadPoolExecutor) as mock_pool,
+        ):
+            detector.detect_issues(paths)
+
+            mock_pool.assert_called_once_with(max_workers=expected)
+
+
+def test_find_matching_parser_after_registration():
+    """Test that parser lookups see parsers registered after an earlier lookup"""
+    detector = VersionDetector()
 
-        # Should still work with the real Terraform parser
-        assert isinstance(issues, list)
+    assert detector.find_matching_parser(Path("requirements.txt")) is None
 
-    finally:
-        temp_path.unlink()
+    custom_parser = MagicMock()
+    custom_parser.name = "Requirements"
+    custom_parser.supported_files = ["requirements*.txt", "deps/*.lock"]
+    detector.register_parser(custom_parser)
+
+    assert detector.find_matching_parser(Path("requirements.txt")) is custom_parser
+    assert detector.find_matching_parser(Path("requirements-dev.txt")) is custom_parser
+    assert detector.find_matching_parser(Path("repo/deps/app.lock")) is custom_parser
+    assert detector.find_matching_parser(Path("app.lock")) is None
+    assert detector.find_matching_parser(Path("main.tf")) is detector.parsers["Terraform"]
+
+
+def test_find_matching_parser_first_registered_wins():
+    """Test that indexed names and suffixes keep registration order across parsers"""
+    detector = VersionDetector()
+
+    docker_parser = MagicMock()
+    docker_parser.name = "Docker"
+    docker_parser.supported_files = ["Dockerfile", "*.dockerfile", "*file"]
+    lock_parser = MagicMock()
+    lock_parser.name = "Lock"
+    lock_parser.supported_files = ["*.tf", "Makefile", "*.tar.gz", "?.lock"]
+    detector.register_parser(docker_parser)
+    detector.register_parser(lock_parser)
+
+    # Terraform was registered first, so it keeps *.tf
+    assert detector.find_matching_parser(Path("main.tf")) is detector.parsers["Terraform"]
+    # "*file" from the earlier parser beats the later exact name
+    assert detector.find_matching_parser(Path("Makefile")) is docker_parser
+    assert detector.find_matching_parser(Path("Dockerfile")) is docker_parser
+    assert detector.find_matching_parser(Path("web.dockerfile")) is docker_parser
+    assert detector.find_matching_parser(Path("dist/app.tar.gz")) is lock_parser
+    assert detector.find_matching_parser(Path("a.lock")) is lock_parser
+    assert detector.find_matching_parser(Path("ab.lock")) is None
+    assert detector.find_matching_parser(Path(".tf")) is detector.parsers["Terraform"]
 
 
 def test_version_detector_custom_config_merge():
@@ -151,41 +231,43 @@ def test_issue_suggestions_formatting():
     assert "~> 4.0.0" in issue.suggestion
 
 
-def test_detect_issues_exception_handling():
-    """Test exception handling during file processing (coverage completion)"""
-    import sys
-    from io import StringIO
+def test_issue_types_use_slots():
+    """Test that per-dependency records do not carry an instance __dict__"""
+    change = VersionChange("hashicorp/aws", None, "4.0.0", None, ">= 4.0.0", "test.tf")
+    issue = Issue(Severity.ERROR, IssueType.UNBOUND_VERSION, "Unbound", change)
 
-    detector = VersionDetector()
+    assert not hasattr(change, "__dict__")
+    assert not hasattr(issue, "__dict__")
 
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".tf", delete=False) as f:
-        f.write("terraform {}")
-        temp_path = Path(f.name)
 
-    try:
-        # Capture stderr to verify error message is printed
-        old_stderr = sys.stderr
-        captured_stderr = StringIO()
-        sys.stderr = captured_stderr
+def test_severity_to_emoji():
+    """Test that every severity has an emoji and to_emoji reads the shared table"""
+    assert Severity.INFO.to_emoji() == "ℹ️"
+    assert Severity.WARNING.to_emoji() == "⚠️"
+    assert Severity.ERROR.to_emoji() == "❌"
+    assert Severity.CRITICAL.to_emoji() == "🚨"
+    assert len({severity.to_emoji() for severity in Severity}) == len(Severity)
 
-        # Mock get_dependency_changes to raise an exception
-        with patch.object(
-            detector, "get_dependency_changes", side_effect=Exception("Test exception")
-        ):
-            issues = detector.detect_issues([temp_path])
 
-            # Should handle exception gracefully and return empty list
-            assert isinstance(issues, list)
+def test_detect_issues_exception_handling(write_tf, caplog, monkeypatch):
+    """Test exception handling during file processing (coverage completion)"""
+    detector = VersionDetector()
+
+    temp_path = write_tf("terraform {}")
+
+    def raise_error(*args, **kwargs):
+        raise Exception("Test exception")
+
+    monkeypatch.setattr(detector, "get_dependency_changes", raise_error)
+    issues = detector.detect_issues([temp_path])
 
-            # Verify error was printed to stderr
-            error_output = captured_stderr.getvalue()
-            assert "Error processing" in error_output
-            assert "Test exception" in error_output
-            assert str(temp_path) in error_output
+    # Should handle exception gracefully and return empty list
+    assert isinstance(issues, list)
 
-    finally:
-        sys.stderr = old_stderr
-        temp_path.unlink()
+    # Verify the error was logged
+    assert "Error processing" in caplog.text
+    assert "Test exception" in caplog.text
+    assert str(temp_path) in caplog.text
 
 
 def test_analyze_version_change_downgrades():
@@ -269,8 +351,7 @@ def test_downgrade_issue_messages():
     assert "removed features" in issue.suggestion
 
     # Test minor downgrade message
-    change.old_version = "1.5.0"
-    change.new_version = "1.2.0"
+    change = replace(change, old_version="1.5.0", new_version="1.2.0")
     issue = detector._create_version_change_issue(change)
     assert issue is not None
     assert issue.issue_type == IssueType.MINOR_VERSION_DOWNGRADE
@@ -279,8 +360,7 @@ def test_downgrade_issue_messages():
     assert "removed features and bug fixes" in issue.suggestion
 
     # Test patch downgrade message
-    change.old_version = "1.2.5"
-    change.new_version = "1.2.3"
+    change = replace(change, old_version="1.2.5", new_version="1.2.3")
     issue = detector._create_version_change_issue(change)
     assert issue is not None
     assert issue.issue_type == IssueType.PATCH_VERSION_DOWNGRADE
@@ -289,6 +369,19 @@ def test_downgrade_issue_messages():
     assert "bug fixes and security patches" in issue.suggestion
 
 
+def test_version_change_messages_keep_braces_in_package_names():
+    """Test that message templates do not interpret braces in substituted values"""
+    detector = VersionDetector()
+    change = VersionChange("example/{name}", "1.0.0", "2.0.0", None, "= 2.0.0", "test.tf")
+
+    issue = detector._create_version_change_issue(change)
+
+    assert issue is not None
+    assert issue.message == (
+        "Major Version Bump detected: example/{name} changed from 1.0.0 to 2.0.0"
+    )
+
+
 def test_upgrade_messages_unchanged():
     """Test that upgrade messages are unchanged"""
     detector = VersionDetector()
@@ -311,6 +404,68 @@ def test_upgrade_messages_unchanged():
     assert "changelog" in issue.suggestion
 
 
+def test_json_report_without_orjson():
+    """Test that the JSON report falls back to the stdlib encoder"""
+    import json
+
+    detector = VersionDetector()
+    change = VersionChange("hashicorp/aws", None, "4.0.0", None, ">= 4.0.0", "test.tf")
+    issues = [Issue(Severity.ERROR, IssueType.UNBOUND_VERSION, "Unbound", change, "Bound it")]
+
+    fast_report = detector.report_issues(issues, "json")
+    with patch("bvd.core.orjson", None):
+        stdlib_report = detector.report_issues(issues, "json")
+
+    assert json.loads(stdlib_report) == json.loads(fast_report)
+    assert stdlib_report == json.dumps(json.loads(stdlib_report), indent=2)
+
+
+def test_issue_to_dict():
+    """Test the JSON record built for an issue"""
+    change = VersionChange("hashicorp/aws", None, "4.0.0", None, ">= 4.0.0", "test.tf")
+    issue = Issue(Severity.ERROR, IssueType.UNBOUND_VERSION, "Unbound", change, "Bound it")
+
+    assert issue.to_dict() == {
+        "severity": "error",
+        "type": "unbound_version",
+        "message": "Unbound",
+        "file": "test.tf",
+        "package": "hashicorp/aws",
+        "suggestion": "Bound it",
+    }
+
+
+def test_report_without_issues():
+    """Test that empty reports stay valid for each format"""
+    detector = VersionDetector()
+
+    assert detector.report_issues([], "json") == "[]"
+    assert detector.report_issues([], "text") == ""
+    assert detector.report_issues([]) == ""
+
+
+def test_text_report_layout():
+    """Test the exact text report layout for issues with and without suggestions"""
+    detector = VersionDetector()
+    change = VersionChange("hashicorp/aws", None, "4.0.0", None, ">= 4.0.0", "test.tf")
+    issues = [
+        Issue(Severity.ERROR, IssueType.UNBOUND_VERSION, "First", change, "Bound it"),
+        Issue(Severity.INFO, IssueType.PATCH_VERSION_BUMP, "Second", change),
+    ]
+
+    assert detector.report_issues(issues) == (
+        "❌ ERROR: First\n"
+        "   File: test.tf\n"
+        "   Package: hashicorp/aws\n"
+        "   Suggestion: Bound it\n"
+        "\n"
+        "ℹ️ INFO: Second\n"
+        "   File: test.tf\n"
+        "   Package: hashicorp/aws\n"
+    )
+    assert detector.report_issues([]) == ""
+
+
 class TestGitDiffFunctionality:
     """Test git diff related functionality"""
 
@@ -318,35 +473,272 @@ class TestGitDiffFunctionality:
         """Test getting file content from git ref successfully"""
         detector = VersionDetector()
 
-        # Mock successful git show command
-        with patch("subprocess.run") as mock_run:
+        # Mock successful git show command, used when cat-file cannot start
+        with (
+            patch("subprocess.Popen", side_effect=FileNotFoundError("git")),
+            patch("subprocess.run") as mock_run,
+        ):
             mock_run.return_value = MagicMock(stdout="file content")
 
             result = detector.get_file_content_at_ref(Path("test.tf"), "HEAD~1")
 
             assert result == "file content"
             mock_run.assert_called_once_with(
-                ["git", "show", "HEAD~1:test.tf"], capture_output=True, text=True, check=True
+                ["git", "show", "HEAD~1:./test.tf"],
+                capture_output=True,
+                text=True,
+                check=True,
+                env=ANY,
             )
 
+    def test_get_file_content_at_ref_persistent_cat_file(self):
+        """Test that lookups share one long-running git cat-file process"""
+        import io
+
+        detector = VersionDetector()
+
+        process = MagicMock()
+        process.stdin = io.BytesIO()
+        process.stdout = io.BytesIO(b"abc123 blob 12\nfile content\nHEAD~1:./gone.tf missing\n")
+
+        with (
+            patch("subprocess.Popen", return_value=process) as mock_popen,
+            patch("subprocess.run") as mock_run,
+        ):
+            assert detector.get_file_content_at_ref(Path("test.tf"), "HEAD~1") == "file content"
+            assert detector.get_file_content_at_ref(Path("gone.tf"), "HEAD~1") is None
+
+            mock_popen.assert_called_once()
+            assert mock_popen.call_args.args[0] == ["git", "cat-file", "--batch"]
+            assert process.stdin.getvalue() == b"HEAD~1:./test.tf\nHEAD~1:./gone.tf\n"
+            mock_run.assert_not_called()
+
+    def test_cat_file_follows_cwd(self, tmp_path, monkeypatch):
+        """Test that the cat-file process is restarted in a new cwd, e.g. another repository"""
+        for name in ["one", "two"]:
+            repo = tmp_path / name
+            repo.mkdir()
+            (repo / "main.tf").write_text(f"# {name}\n")
+            for args in (["init", "-q"], ["add", "."], ["commit", "-q", "-m", name]):
+                subprocess.run(
+                    ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+                    cwd=repo,
+                    capture_output=True,
+                    check=True,
+                )
+
+        with VersionDetector() as detector:
+            monkeypatch.chdir(tmp_path / "one")
+            assert detector.get_file_content_at_ref(Path("main.tf"), "HEAD") == "# one\n"
+            monkeypatch.chdir(tmp_path / "two")
+            assert detector.get_file_content_at_ref(Path("main.tf"), "HEAD") == "# two\n"
+
+    def test_get_file_content_at_ref_cat_file_exits(self):
+        """Test falling back to git show when cat-file exits, e.g. outside a repository"""
+        import io
+
+        detector = VersionDetector()
+
+        process = MagicMock()
+        process.stdin = io.BytesIO()
+        process.stdout = io.BytesIO(b"")
+
+        with (
+            patch("subprocess.Popen", return_value=process) as mock_popen,
+            patch("subprocess.run") as mock_run,
+        ):
+            mock_run.return_value = MagicMock(stdout="file content")
+
+            assert detector.get_file_content_at_ref(Path("test.tf"), "HEAD~1") == "file content"
+            assert detector.get_file_content_at_ref(Path("test.tf"), "HEAD~1") == "file content"
+
+            # The dead process is not restarted for every lookup
+            mock_popen.assert_called_once()
+            assert mock_run.call_count == 2
+
+    def test_close_stops_cat_file_process(self):
+        """Test that leaving the detector's context shuts down the cat-file process"""
+        process = MagicMock()
+
+        with VersionDetector() as detector:
+            detector._cat_file._process = process
+
+        process.stdin.close.assert_called_once()
+        process.wait.assert_called_once()
+        assert detector._cat_file._process is None
+
     def test_get_file_content_at_ref_failure(self):
         """Test git show command failure"""
         detector = VersionDetector()
 
         # Mock failed git show command
-        with patch("subprocess.run") as mock_run:
+        with (
+            patch("subprocess.Popen", side_effect=FileNotFoundError("git")),
+            patch("subprocess.run") as mock_run,
+        ):
             mock_run.side_effect = subprocess.CalledProcessError(1, "git")
 
             result = detector.get_file_content_at_ref(Path("test.tf"), "HEAD~1")
 
             assert result is None
 
+    def make_cat_file_process(self, stdout: bytes):
+        """Fake git cat-file --batch process with canned replies"""
+        import io
+
+        process = MagicMock()
+        process.stdin = io.BytesIO()
+        process.stdout = io.BytesIO(stdout)
+        return process
+
+    def test_fetch_old_blobs_single_batch_call(self):
+        """Test that old contents for all files come from one pipelined cat-file round trip"""
+        detector = VersionDetector()
+
+        process = self.make_cat_file_process(
+            b"abc123 blob 5\nfirst\nHEAD~1:./new.tf missing\ndef456 blob 6\nsecond\n"
+            b"HEAD~1:./c.tf missing\n"
+        )
+        with patch("subprocess.Popen", return_value=process) as mock_popen:
+            paths = [Path("a.tf"), Path("new.tf"), Path("b.tf")]
+            result = detector._fetch_old_blobs(paths, "HEAD~1")
+
+            assert result == {Path("a.tf"): "first", Path("new.tf"): None, Path("b.tf"): "second"}
+            assert process.stdin.getvalue().startswith(
+                b"HEAD~1:./a.tf\nHEAD~1:./new.tf\nHEAD~1:./b.tf\n"
+            )
+            mock_popen.assert_called_once()
+            assert mock_popen.call_args.args[0] == ["git", "cat-file", "--batch"]
+            assert mock_popen.call_args.kwargs["env"]["GIT_OPTIONAL_LOCKS"] == "0"
+
+            # Later single lookups reuse the same process
+            assert detector.get_file_content_at_ref(Path("c.tf"), "HEAD~1") is None
+            mock_popen.assert_called_once()
+
+    def test_fetch_old_blobs_crlf_content(self):
+        """Test that blobs with Windows line endings are normalized like text mode reads"""
+        detector = VersionDetector()
+
+        process = self.make_cat_file_process(b"abc123 blob 6\na\r\nb\r\n\n")
+        with patch("subprocess.Popen", return_value=process):
+            assert detector._fetch_old_blobs([Path("a.tf")], "HEAD~1") == {Path("a.tf"): "a\nb\n"}
+
+    def test_fetch_old_blobs_git_error(self):
+        """Test that a git cat-file that cannot start yields no prefetched blobs"""
+        detector = VersionDetector()
+
+        with patch("subprocess.Popen", side_effect=FileNotFoundError("git")):
+            assert detector._fetch_old_blobs([Path("a.tf"), Path("b.tf")], "HEAD~1") == {}
+
+    def test_fetch_old_blobs_truncated_output(self):
+        """Test that unexpected cat-file output falls back to per-file lookups"""
+        detector = VersionDetector()
+
+        process = self.make_cat_file_process(b"abc123 blob 5\nfir")
+        with patch("subprocess.Popen", return_value=process):
+            assert detector._fetch_old_blobs([Path("a.tf"), Path("b.tf")], "HEAD~1") == {}
+
+    def test_get_file_content_at_ref_uses_prefetched_blobs(self):
+        """Test that prefetched blobs are served without spawning git"""
+        detector = VersionDetector()
+        detector._old_blobs = {("HEAD~1", Path("test.tf")): "old content"}
+
+        with patch("subprocess.run") as mock_run:
+            assert detector.get_file_content_at_ref(Path("test.tf"), "HEAD~1") == "old content"
+            mock_run.assert_not_called()
+
+    def test_changed_only_skips_unchanged_files(self):
+        """Test that changed_only drops passed files git does not report as changed"""
+        detector = VersionDetector({"changed_only": True})
+
+        with (
+            patch.object(detector, "get_changed_files", return_value=[Path("changed.tf")]),
+            patch.object(detector, "_process_file_for_issues", return_value=[]) as mock_process,
+        ):
+            detector.detect_issues([Path("changed.tf"), Path("unchanged.tf")])
+
+            processed = [call.args[0] for call in mock_process.call_args_list]
+            assert processed == [Path("changed.tf")]
+
+    @pytest.fixture
+    def subdir_repo(self, tmp_path, monkeypatch, write_tf):
+        """git repository with a committed infra/main.tf, cwd in infra/ and aws bumped to 5.x"""
+
+        def git(*args):
+            subprocess.run(
+                ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+                cwd=tmp_path,
+                capture_output=True,
+                check=True,
+            )
+
+        git("init", "-q")
+        (tmp_path / "infra").mkdir()
+        tf_file = write_tf(
+            "terraform {\n  required_providers {\n    aws = {\n"
+            '      source  = "hashicorp/aws"\n      version = "~> 4.0"\n    }\n  }\n}\n',
+            "infra/main.tf",
+        )
+        git("add", ".")
+        git("commit", "-q", "-m", "initial")
+        old_content = tf_file.read_text()
+        tf_file.write_text(old_content.replace("~> 4.0", ">= 5.0.0"))
+
+        monkeypatch.chdir(tf_file.parent)
+        return old_content
+
+    def test_file_content_at_ref_from_subdirectory(self, subdir_repo):
+        """Test that old contents are found for cwd relative paths below the repository root"""
+        with VersionDetector() as detector:
+            assert detector.get_file_content_at_ref(Path("main.tf"), "HEAD") == subdir_repo
+            assert detector._fetch_old_blobs([Path("main.tf")], "HEAD") == {
+                Path("main.tf"): subdir_repo
+            }
+
+        # git show fallback
+        with (
+            VersionDetector() as detector,
+            patch.object(detector._cat_file, "lookup", return_value=(False, None)),
+        ):
+            assert detector.get_file_content_at_ref(Path("main.tf"), "HEAD") == subdir_repo
+
+    def test_changed_only_from_subdirectory(self, subdir_repo, monkeypatch):
+        """Test that changed_only keeps changed files when run below the repository root"""
+        with VersionDetector({"changed_only": True}) as detector:
+            issues = detector.detect_issues([Path("main.tf")], "HEAD")
+
+        assert [issue.issue_type for issue in issues] == [
+            IssueType.UNBOUND_VERSION,
+            IssueType.MAJOR_VERSION_BUMP,
+        ]
+        bump = issues[1].change
+        assert (bump.old_version, bump.new_version) == ("4.0", "5.0.0")
+
+        # Same findings as a plain scan from the repository root
+        monkeypatch.chdir("..")
+        with VersionDetector() as detector:
+            from_root = detector.detect_issues([Path("infra/main.tf")], "HEAD")
+        assert [issue.message for issue in from_root] == [issue.message for issue in issues]
+
+    def test_changed_only_disabled_by_default(self):
+        """Test that passed files are all scanned unless changed_only is set"""
+        detector = VersionDetector()
+
+        with (
+            patch.object(detector, "get_changed_files") as mock_get_changed,
+            patch.object(detector, "_process_file_for_issues", return_value=[]) as mock_process,
+        ):
+            detector.detect_issues([Path("changed.tf"), Path("unchanged.tf")])
+
+            mock_get_changed.assert_not_called()
+            assert mock_process.call_count == 2
+
     def test_get_changed_files_success(self):
         """Test getting changed files from git diff"""
         detector = VersionDetector()
 
         with patch("subprocess.run") as mock_run:
-            mock_run.return_value = MagicMock(stdout="file1.tf\nfile2.tf\n")
+            mock_run.side_effect = git_diff_outputs(b"file1.tf\0file2.tf\0")
 
             # Mock Path.exists to return True
             with patch.object(Path, "exists", return_value=True):
@@ -356,12 +748,31 @@ class TestGitDiffFunctionality:
                 assert result[0].name == "file1.tf"
                 assert result[1].name == "file2.tf"
 
+    def test_get_changed_files_unusual_names(self):
+        """Test that paths with spaces and newlines come through unquoted"""
+        detector = VersionDetector()
+
+        with patch("subprocess.run") as mock_run:
+            mock_run.side_effect = git_diff_outputs(b"my dir/main.tf\0odd\nname.tf\0")
+
+            with patch.object(Path, "exists", return_value=True):
+                result = detector.get_changed_files("HEAD~1")
+
+                assert result == [Path("my dir/main.tf"), Path("odd\nname.tf")]
+                mock_run.assert_called_with(
+                    ["git", "diff", "-z", "--name-only", "--diff-filter=d", "HEAD~1"],
+                    capture_output=True,
+                    check=True,
+                    env=ANY,
+                )
+                assert mock_run.call_args.kwargs["env"]["GIT_OPTIONAL_LOCKS"] == "0"
+
     def test_get_changed_files_nonexistent_files(self):
         """Test that nonexistent files are filtered out"""
         detector = VersionDetector()
 
         with patch("subprocess.run") as mock_run:
-            mock_run.return_value = MagicMock(stdout="existing.tf\ndeleted.tf\n")
+            mock_run.side_effect = git_diff_outputs(b"existing.tf\0deleted.tf\0")
 
             # Mock exists to return True only for existing.tf
             def mock_exists(self):
@@ -424,98 +835,218 @@ terraform {
 }
 """
 
-    def test_get_dependency_changes_with_modifications(self):
+    def test_get_dependency_changes_with_modifications(self, write_tf):
         """Test detecting dependency changes between versions"""
         detector = VersionDetector()
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".tf", delete=False) as f:
-            f.write(self.new_terraform_content)
-            temp_path = Path(f.name)
-
-        try:
-            # Mock git show to return old content
-            with patch.object(
-                detector, "get_file_content_at_ref", return_value=self.old_terraform_content
-            ):
-                changes = detector.get_dependency_changes(temp_path, "HEAD~1")
+        temp_path = write_tf(self.new_terraform_content)
 
-                assert len(changes) == 3  # aws, kubernetes, helm
+        # Mock git show to return old content
+        with patch.object(
+            detector, "get_file_content_at_ref", return_value=self.old_terraform_content
+        ):
+            changes = detector.get_dependency_changes(temp_path, "HEAD~1")
 
-                # Check AWS version change
-                aws_change = next(c for c in changes if "aws" in c.package_name)
-                assert aws_change.old_version == "4.0.0"
-                assert aws_change.new_version == "5.0.0"
-                assert aws_change.old_constraint == "~> 4.0.0"
-                assert aws_change.new_constraint == "~> 5.0.0"
+            assert len(changes) == 3  # aws, kubernetes, helm
+            by_package = {c.package_name: c for c in changes}
 
-                # Check Kubernetes version change
-                k8s_change = next(c for c in changes if "kubernetes" in c.package_name)
-                assert k8s_change.old_version == "2.0.0"
-                assert k8s_change.new_version == "2.1.0"
+            # Check AWS version change
+            aws_change = by_package["hashicorp/aws"]
+            assert aws_change.old_version == "4.0.0"
+            assert aws_change.new_version == "5.0.0"
+            assert aws_change.old_constraint == "~> 4.0.0"
+            assert aws_change.new_constraint == "~> 5.0.0"
 
-                # Check Helm (new dependency)
-                helm_change = next(c for c in changes if "helm" in c.package_name)
-                assert helm_change.old_version is None  # New dependency
-                assert helm_change.new_version == "2.0.0"
+            # Check Kubernetes version change
+            k8s_change = by_package["hashicorp/kubernetes"]
+            assert k8s_change.old_version == "2.0.0"
+            assert k8s_change.new_version == "2.1.0"
 
-        finally:
-            temp_path.unlink()
+            # Check Helm (new dependency)
+            helm_change = by_package["hashicorp/helm"]
+            assert helm_change.old_version is None  # New dependency
+            assert helm_change.new_version == "2.0.0"
 
-    def test_get_dependency_changes_new_file(self):
+    def test_get_dependency_changes_new_file(self, write_tf):
         """Test handling of completely new files"""
         detector = VersionDetector()
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".tf", delete=False) as f:
-            f.write(self.new_terraform_content)
-            temp_path = Path(f.name)
+        temp_path = write_tf(self.new_terraform_content)
 
-        try:
-            # Mock git show to return None (file doesn't exist in old ref)
-            with patch.object(detector, "get_file_content_at_ref", return_value=None):
-                changes = detector.get_dependency_changes(temp_path, "HEAD~1")
+        # Mock git show to return None (file doesn't exist in old ref)
+        with patch.object(detector, "get_file_content_at_ref", return_value=None):
+            changes = detector.get_dependency_changes(temp_path, "HEAD~1")
+
+            assert len(changes) == 3
+            # All should be new dependencies
+            for change in changes:
+                assert change.old_version is None
+                assert change.old_constraint is None
+
+    def test_process_file_resolves_parser_once(self, write_tf):
+        """Test that the parser found for issue detection is reused for the changes"""
+        detector = VersionDetector()
 
-                assert len(changes) == 3
-                # All should be new dependencies
-                for change in changes:
-                    assert change.old_version is None
-                    assert change.old_constraint is None
+        temp_path = write_tf(self.new_terraform_content)
+
+        with (
+            patch.object(
+                detector, "get_file_content_at_ref", return_value=self.old_terraform_content
+            ),
+            patch.object(
+                detector, "find_matching_parser", wraps=detector.find_matching_parser
+            ) as mock_find,
+        ):
+            issues = detector._process_file_for_issues(temp_path, "HEAD~1")
 
-        finally:
-            temp_path.unlink()
+        assert issues
+        assert mock_find.call_count == 1
 
-    def test_get_dependency_changes_no_parser(self):
+    def test_get_dependency_changes_no_parser(self, tmp_path):
         """Test handling files with no matching parser"""
         detector = VersionDetector()
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".unknown", delete=False) as f:
-            f.write("some content")
-            temp_path = Path(f.name)
+        temp_path = tmp_path / "main.unknown"
+        temp_path.write_text("some content")
 
-        try:
+        changes = detector.get_dependency_changes(temp_path, "HEAD~1")
+        assert changes == []
+
+    def test_get_dependency_changes_parsing_error(self, write_tf):
+        """Test handling of parsing errors"""
+        detector = VersionDetector()
+
+        temp_path = write_tf("invalid terraform content")
+
+        with patch.object(detector, "get_file_content_at_ref", return_value="old invalid content"):
             changes = detector.get_dependency_changes(temp_path, "HEAD~1")
+            # Should handle error gracefully and return empty list
             assert changes == []
 
-        finally:
-            temp_path.unlink()
+    def test_parse_cache_reuses_identical_content(self):
+        """Test that identical content is only parsed once across files"""
+        detector = VersionDetector()
+        parser = detector.parsers["Terraform"]
 
-    def test_get_dependency_changes_parsing_error(self):
-        """Test handling of parsing errors"""
+        with patch.object(
+            parser, "parse_dependencies", wraps=parser.parse_dependencies
+        ) as mock_parse:
+            first = detector._parse_dependencies(
+                parser, Path("a/versions.tf"), self.new_terraform_content
+            )
+            second = detector._parse_dependencies(
+                parser, Path("b/versions.tf"), self.new_terraform_content
+            )
+
+            assert mock_parse.call_count == 1
+            assert {c.file_path for c in first} == {"a/versions.tf"}
+            assert {c.file_path for c in second} == {"b/versions.tf"}
+
+            # Entries carry no path of their own, and a new parser version parses again
+            (entry,) = detector._parse_cache.values()
+            assert {c.file_path for c in entry} == {""}
+            with patch.object(parser, "version", "2"):
+                detector._parse_dependencies(
+                    parser, Path("a/versions.tf"), self.new_terraform_content
+                )
+            assert mock_parse.call_count == 2
+
+    def test_parse_cache_skips_failed_parses(self, caplog):
+        """Test that every file with unparseable content reports the error"""
         detector = VersionDetector()
+        parser = detector.parsers["Terraform"]
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".tf", delete=False) as f:
-            f.write("invalid terraform content")
-            temp_path = Path(f.name)
+        for name in ["a/main.tf", "b/main.tf"]:
+            assert detector._parse_dependencies(parser, Path(name), "terraform {\n") == []
+            assert f"Error parsing {name}" in caplog.text
 
-        try:
-            with patch.object(
-                detector, "get_file_content_at_ref", return_value="old invalid content"
-            ):
-                changes = detector.get_dependency_changes(temp_path, "HEAD~1")
-                # Should handle error gracefully and return empty list
-                assert changes == []
+        assert detector._parse_cache == {}
+
+    def test_parse_cache_entries_are_immutable(self):
+        """Test that changes shared through the parse cache cannot be modified"""
+        from dataclasses import FrozenInstanceError
+
+        detector = VersionDetector()
+        parser = detector.parsers["Terraform"]
 
-        finally:
-            temp_path.unlink()
+        first = detector._parse_dependencies(parser, Path("main.tf"), self.new_terraform_content)
+        with pytest.raises(FrozenInstanceError):
+            first[0].old_version = "1.0.0"
+
+        second = detector._parse_dependencies(parser, Path("main.tf"), self.new_terraform_content)
+        assert second[0].old_version is None
+
+    def test_comment_only_edit_skips_old_parse(self, write_tf):
+        """Test that edits outside dependency lines reuse the current parse for the old file"""
+        detector = VersionDetector()
+        parser = detector.parsers["Terraform"]
+        old_content = "# Pinned providers\n" + self.old_terraform_content
+        new_content = "\n// Pinned providers, see docs\n" + self.old_terraform_content
+
+        temp_path = write_tf(new_content)
+
+        with (
+            patch.object(detector, "get_file_content_at_ref", return_value=old_content),
+            patch.object(
+                parser, "parse_dependencies", wraps=parser.parse_dependencies
+            ) as mock_parse,
+        ):
+            changes = detector.get_dependency_changes(temp_path, "HEAD~1")
+
+            assert mock_parse.call_count == 1
+            aws_change = next(c for c in changes if "aws" in c.package_name)
+            assert aws_change.old_version == aws_change.new_version == "4.0.0"
+            assert aws_change.old_constraint == "~> 4.0.0"
+
+    def test_get_dependency_changes_crlf_file(self, tmp_path):
+        """Test that files with Windows line endings parse like LF files"""
+        detector = VersionDetector()
+
+        temp_path = tmp_path / "main.tf"
+        temp_path.write_bytes(self.new_terraform_content.replace("\n", "\r\n").encode())
+
+        with patch.object(
+            detector, "get_file_content_at_ref", return_value=self.old_terraform_content
+        ):
+            changes = detector.get_dependency_changes(temp_path, "HEAD~1")
+
+        aws_change = next(c for c in changes if "aws" in c.package_name)
+        assert aws_change.old_version == "4.0.0"
+        assert aws_change.new_version == "5.0.0"
+
+    def test_unchanged_file_parsed_once(self, write_tf):
+        """Test that a file identical to its base ref version is parsed only once"""
+        detector = VersionDetector()
+        parser = detector.parsers["Terraform"]
+
+        temp_path = write_tf(self.new_terraform_content)
+
+        with (
+            patch.object(
+                detector, "get_file_content_at_ref", return_value=self.new_terraform_content
+            ),
+            patch.object(parser, "dependency_line_re", None),
+            patch.object(
+                parser, "parse_dependencies", wraps=parser.parse_dependencies
+            ) as mock_parse,
+        ):
+            changes = detector.get_dependency_changes(temp_path, "HEAD~1")
+
+            assert mock_parse.call_count == 1
+            assert len(changes) == 3
+            assert all(c.old_version == c.new_version for c in changes)
+
+    def test_same_dependency_lines(self):
+        """Test which edits count as touching dependency lines"""
+        parser = VersionDetector().parsers["Terraform"]
+        content = self.old_terraform_content
+
+        same = VersionDetector._same_dependency_lines
+        assert same(parser, content, "# comment\n\n" + content)
+        assert not same(parser, content, self.new_terraform_content)
+        # Opening a block comment changes the meaning of the lines that follow it
+        assert not same(parser, content, "# /*\n" + content)
+        assert not same(MagicMock(dependency_line_re=None), content, content)
 
 
 class TestVersionChangeAnalysis:
@@ -588,26 +1119,36 @@ class TestVersionChangeAnalysis:
         result = detector.analyze_version_change("1.0.0-rc1", "1.1.0")
         assert result == IssueType.MINOR_VERSION_BUMP
 
+    def test_analyze_version_change_most_significant_component_wins(self):
+        """Test that the highest changed component decides, whatever the lower ones do"""
+        detector = VersionDetector()
+
+        assert detector.analyze_version_change("1.9.9", "2.0.0") == IssueType.MAJOR_VERSION_BUMP
+        assert detector.analyze_version_change("2.0.0", "1.9.9") == (
+            IssueType.MAJOR_VERSION_DOWNGRADE
+        )
+        assert detector.analyze_version_change("1.2.9", "1.1.0") == (
+            IssueType.MINOR_VERSION_DOWNGRADE
+        )
+        assert detector.analyze_version_change("1.2.3", "1.2.1") == (
+            IssueType.PATCH_VERSION_DOWNGRADE
+        )
+        assert detector.analyze_version_change("1.2", "1.2.0") is None
+
 
 class TestEdgeCases:
     """Test edge cases and error handling"""
 
-    def test_empty_file_handling(self):
+    def test_empty_file_handling(self, write_tf):
         """Test handling of empty files"""
         detector = VersionDetector()
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".tf", delete=False) as f:
-            f.write("")  # Empty file
-            temp_path = Path(f.name)
+        temp_path = write_tf("")  # Empty file
 
-        try:
-            issues = detector.detect_issues([temp_path])
-            assert issues == []  # Should handle gracefully
-
-        finally:
-            temp_path.unlink()
+        issues = detector.detect_issues([temp_path])
+        assert issues == []  # Should handle gracefully
 
-    def test_malformed_terraform_content(self):
+    def test_malformed_terraform_content(self, write_tf):
         """Test handling of malformed Terraform content"""
         detector = VersionDetector()
 
@@ -620,19 +1161,13 @@ terraform {
     }
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".tf", delete=False) as f:
-            f.write(malformed_content)
-            temp_path = Path(f.name)
-
-        try:
-            # Should not crash, should handle parsing errors gracefully
-            _issues = detector.detect_issues([temp_path])
-            # May return empty list or partial results, but shouldn't crash
+        temp_path = write_tf(malformed_content)
 
-        finally:
-            temp_path.unlink()
+        # Should not crash, should handle parsing errors gracefully
+        _issues = detector.detect_issues([temp_path])
+        # May return empty list or partial results, but shouldn't crash
 
-    def test_terraform_without_providers(self):
+    def test_terraform_without_providers(self, write_tf):
         """Test Terraform files without provider blocks"""
         detector = VersionDetector()
 
@@ -643,18 +1178,12 @@ resource "aws_instance" "example" {
 }
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".tf", delete=False) as f:
-            f.write(terraform_content)
-            temp_path = Path(f.name)
+        temp_path = write_tf(terraform_content)
 
-        try:
-            issues = detector.detect_issues([temp_path])
-            assert issues == []  # No providers, no issues
-
-        finally:
-            temp_path.unlink()
+        issues = detector.detect_issues([temp_path])
+        assert issues == []  # No providers, no issues
 
-    def test_complex_terraform_structure(self):
+    def test_complex_terraform_structure(self, write_tf):
         """Test complex Terraform with multiple blocks"""
         detector = VersionDetector()
 
@@ -687,20 +1216,14 @@ terraform {
 }
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".tf", delete=False) as f:
-            f.write(terraform_content)
-            temp_path = Path(f.name)
+        temp_path = write_tf(terraform_content)
 
-        try:
-            issues = detector.detect_issues([temp_path])
-
-            # Should find unbound kubernetes version
-            unbound_issues = [i for i in issues if i.issue_type == IssueType.UNBOUND_VERSION]
-            assert len(unbound_issues) == 1
-            assert "kubernetes" in unbound_issues[0].message
+        issues = detector.detect_issues([temp_path])
 
-        finally:
-            temp_path.unlink()
+        # Should find unbound kubernetes version
+        unbound_issues = [i for i in issues if i.issue_type == IssueType.UNBOUND_VERSION]
+        assert len(unbound_issues) == 1
+        assert "kubernetes" in unbound_issues[0].message
 
     def test_file_reading_errors(self):
         """Test handling of file reading errors"""
@@ -728,7 +1251,7 @@ terraform {
             content = detector.get_file_content_at_ref(Path("test.tf"), "HEAD~1")
             assert content is None
 
-    def test_unicode_content_handling(self):
+    def test_unicode_content_handling(self, write_tf):
         """Test handling of files with unicode content"""
         detector = VersionDetector()
 
@@ -744,22 +1267,14 @@ terraform {
 }
 """
 
-        with tempfile.NamedTemporaryFile(
-            mode="w", suffix=".tf", delete=False, encoding="utf-8"
-        ) as f:
-            f.write(terraform_content)
-            temp_path = Path(f.name)
+        temp_path = write_tf(terraform_content)
 
-        try:
-            # Should handle unicode content without issues
-            issues = detector.detect_issues([temp_path])
-            # Should work normally, finding AWS provider
-            assert len(issues) == 0  # AWS has bound version
-
-        finally:
-            temp_path.unlink()
+        # Should handle unicode content without issues
+        issues = detector.detect_issues([temp_path])
+        # Should work normally, finding AWS provider
+        assert len(issues) == 0  # AWS has bound version
 
-    def test_large_file_handling(self):
+    def test_large_file_handling(self, write_tf):
         """Test handling of large Terraform files"""
         detector = VersionDetector()
 
@@ -783,20 +1298,14 @@ terraform {
 }
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".tf", delete=False) as f:
-            f.write(terraform_content)
-            temp_path = Path(f.name)
-
-        try:
-            # Should handle large files without performance issues
-            issues = detector.detect_issues([temp_path])
+        temp_path = write_tf(terraform_content)
 
-            # Should find 100 unbound version issues
-            unbound_issues = [i for i in issues if i.issue_type == IssueType.UNBOUND_VERSION]
-            assert len(unbound_issues) == 100
+        # Should handle large files without performance issues
+        issues = detector.detect_issues([temp_path])
 
-        finally:
-            temp_path.unlink()
+        # Should find 100 unbound version issues
+        unbound_issues = [i for i in issues if i.issue_type == IssueType.UNBOUND_VERSION]
+        assert len(unbound_issues) == 100
 
 
 class TestConfigurationEdgeCases:
@@ -843,7 +1352,7 @@ class TestConfigurationEdgeCases:
         # Should work normally with valid config
         assert detector.config["rules"][IssueType.MAJOR_VERSION_BUMP] == Severity.CRITICAL
 
-    def test_none_config_values(self):
+    def test_none_config_values(self, write_tf):
         """Test handling of None values in configuration"""
         config = {
             "rules": {
@@ -856,25 +1365,87 @@ class TestConfigurationEdgeCases:
         detector = VersionDetector(config)
 
         # Should handle None values gracefully
-        terraform_content = """
-terraform {
-  required_providers {
-    aws = {
-      source  = "hashicorp/aws"
-      version = ">= 4.0.0"
-    }
-  }
-}
-"""
+        temp_path = write_tf(AWS_UNBOUND_TF)
+
+        # Should not crash with None critical_packages
+        issues = detector.detect_issues([temp_path])
+        assert len(issues) >= 1  # Should find unbound version
+
+    def test_ignore_packages_applied_in_parallel_scan(self):
+        """Test that ignore_packages is honoured when files are processed on the thread pool"""
+        detector = VersionDetector({"ignore_packages": ["hashicorp/aws"]})
+        changes = [
+            VersionChange("hashicorp/aws", None, "5.0.0", None, ">= 5.0", "main.tf"),
+            VersionChange("hashicorp/google", None, "5.0.0", None, ">= 5.0", "main.tf"),
+        ]
+        paths = [Path(f"mod{i}/main.tf") for i in range(PARALLEL_MIN_FILES)]
+
+        with (
+            patch.object(detector, "_fetch_old_blobs", return_value={}),
+            patch.object(detector, "get_dependency_changes", return_value=changes),
+        ):
+            issues = detector.detect_issues(paths)
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".tf", delete=False) as f:
-            f.write(terraform_content)
-            temp_path = Path(f.name)
+        assert len(issues) == len(paths)
+        assert {issue.change.package_name for issue in issues} == {"hashicorp/google"}
+
+    def test_ignore_packages_none(self):
+        """Test that a None ignore_packages value ignores nothing"""
+        detector = VersionDetector({"ignore_packages": None})
+        assert detector._ignored_packages() == frozenset()
+
+    def test_severity_follows_config_changes_between_scans(self):
+        """Test that memoized severities are recomputed when a new scan starts"""
+        detector = VersionDetector()
+        change = VersionChange("my/package", None, "5.0.0", None, ">= 5.0", "main.tf")
+        paths = [Path("main.tf")]
+
+        with (
+            patch.object(detector, "_fetch_old_blobs", return_value={}),
+            patch.object(detector, "get_dependency_changes", return_value=[change]),
+        ):
+            assert detector.detect_issues(paths)[0].severity == Severity.ERROR
+
+            detector.config["critical_packages"] = {"my/package": Severity.CRITICAL}
+            assert detector.detect_issues(paths)[0].severity == Severity.CRITICAL
+
+    def test_result_cache_reused_across_detectors(self, tmp_path, caplog):
+        """Test that a second run over unchanged files is answered from the result cache"""
+        tf_file = tmp_path / "main.tf"
+        tf_file.write_text(
+            'terraform {\n  required_providers {\n    aws = {\n      source = "hashicorp/aws"\n'
+            '      version = ">= 5.0.0"\n    }\n  }\n}\n'
+        )
+        config = {"cache": True, "cache_path": tmp_path / "results.db"}
+
+        first = VersionDetector(config)
+        with patch.object(first, "get_file_content_at_ref", return_value=None):
+            issues = first.detect_issues([tf_file])
+        first.close()
+        assert [issue.issue_type for issue in issues] == [IssueType.UNBOUND_VERSION]
+
+        second = VersionDetector(config)
+        with (
+            patch.object(second, "get_file_content_at_ref", return_value=None),
+            patch.object(second, "get_dependency_changes") as mock_changes,
+            caplog.at_level(logging.DEBUG, logger="bvd"),
+        ):
+            assert second.detect_issues([tf_file]) == issues
+            mock_changes.assert_not_called()
+            assert "Result cache: 1 hits, 0 misses" in caplog.text
+
+            # Any edit to the file is a miss
+            tf_file.write_text(tf_file.read_text().replace(">= 5.0.0", "~> 5.0.0"))
+            mock_changes.return_value = []
+            assert second.detect_issues([tf_file]) == []
+            mock_changes.assert_called_once()
+        second.close()
+
+    def test_result_cache_disabled_by_default(self):
+        """Test that no cache is opened unless requested"""
+        detector = VersionDetector()
 
-        try:
-            # Should not crash with None critical_packages
-            issues = detector.detect_issues([temp_path])
-            assert len(issues) >= 1  # Should find unbound version
+        with patch("bvd.core.ResultCache") as mock_cache:
+            detector.detect_issues([])
 
-        finally:
-            temp_path.unlink()
+            mock_cache.assert_not_called()
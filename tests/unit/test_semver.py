@@ -2,7 +2,9 @@
 Tests for semver utility functions
 """
 
-from src.bvd.semver import (
+from bvd.semver import (
+    _parse_version,
+    _release_triple,
     compare_versions,
     extract_version_from_constraint,
     is_valid_semver,
@@ -180,3 +182,25 @@ class TestSemverUtils:
             # Should be parseable by packaging
             parsed = version.parse(ver_str)
             assert parsed is not None
+
+    def test_parse_version_is_memoized(self):
+        """Test that repeated version strings reuse one parsed object"""
+        first = _parse_version("7.8.9")
+        assert first is not None
+        assert _parse_version("7.8.9") is first
+
+        # Invalid strings are remembered as None instead of re-raising
+        hits = _parse_version.cache_info().hits
+        assert _parse_version("not-a-version") is None
+        assert _parse_version("not-a-version") is None
+        assert _parse_version.cache_info().hits == hits + 1
+
+    def test_release_triple(self):
+        """Test that release components are padded and cached per version string"""
+        assert _release_triple("2") == (2, 0, 0)
+        assert _release_triple("1.2.3-alpha") == (1, 2, 3)
+        assert _release_triple("invalid") is None
+
+        hits = _release_triple.cache_info().hits
+        assert compare_versions("2", "1.2.3-alpha") == (-1, 2, 3)
+        assert _release_triple.cache_info().hits == hits + 2